@@ -43,6 +43,10 @@ def create_app() -> FastAPI:
         else:
             logger.error(f"Failed to connect to database: {db_status['message']}")
             logger.warning("Application will start but calls requiring database access may fail")
+        
+        # Establish the ElevenLabs connection before the first call needs it
+        from app.services.elevenlabs import prewarm_api_client
+        await prewarm_api_client()
     
     @app.on_event("shutdown")
     async def shutdown_event():
@@ -14,9 +14,9 @@ from sqlalchemy.orm import Session
 
 from app.utils.logging import get_logger
 from app.utils.helpers import generate_connection_id, get_current_time
-from app.services.audio_interface import TwilioAudioInterface
+from app.services.audio_interface import TwilioAudioInterface, parse_twilio_frame
 from app.services.twilio import set_call_context, send_hangup_message
-from app.services.elevenlabs import get_system_prompt_template, get_first_message_template, create_conversation
+from app.services.elevenlabs import get_system_prompt_template, get_first_message_template, create_conversation, serialize_system_prompt
 from app.core.restaurant import get_restaurant_by_id, get_restaurant_by_phone, get_default_restaurant
 from app.core.agent import get_agent_by_restaurant, get_default_agent 
 from app.core.call import create_call, update_call, end_call, get_active_call_by_sid
@@ -66,27 +66,23 @@ async def handle_incoming_call(request: Request, db: Session = Depends(get_db)):
     settings = get_settings(restaurant.id)
     if settings:
         from datetime import datetime
-        import pytz
+        from zoneinfo import ZoneInfo
         from app.utils.helpers import get_current_time
         
         # Get current time in restaurant's timezone
-        tz = pytz.timezone(restaurant.timezone)
+        tz = ZoneInfo(restaurant.timezone)
         now = get_current_time().astimezone(tz)
         
-        # Parse operating hours
-        from datetime import time
-        start_hour, start_minute = map(int, settings.call_hours_start.split(':'))
-        end_hour, end_minute = map(int, settings.call_hours_end.split(':'))
-        
-        start_time = time(start_hour, start_minute)
-        end_time = time(end_hour, end_minute)
+        # Operating hours are already parsed into time objects on the settings schema
+        start_time = settings.call_hours_start
+        end_time = settings.call_hours_end
         current_time = now.time()
         
         # Check if current time is outside operating hours
         if current_time < start_time or current_time > end_time:
             # Return TwiML to play a message and hang up
             response = VoiceResponse()
-            response.say(f"Thank you for calling {restaurant.name}. We are currently closed. Our hours are from {settings.call_hours_start} to {settings.call_hours_end}. Please call back during our operating hours.")
+            response.say(f"Thank you for calling {restaurant.name}. We are currently closed. Our hours are from {settings.call_hours_start:%H:%M} to {settings.call_hours_end:%H:%M}. Please call back during our operating hours.")
             response.hangup()
             return HTMLResponse(content=str(response), media_type="application/xml")
     
@@ -215,7 +211,7 @@ async def handle_media_stream(websocket: WebSocket, db: Session = Depends(get_db
             "conversation_config_override": {
                 "agent": {
                     "prompt": {
-                        "prompt": json.dumps(agent.system_prompt),
+                        "prompt": serialize_system_prompt(agent.system_prompt),
                         "tools": agent.tools
                     },
                     "first_message": get_first_message_template().format(
@@ -311,7 +307,7 @@ async def handle_media_stream(websocket: WebSocket, db: Session = Depends(get_db
                     logger.debug(f"[CONN:{connection_id}] Received message #{message_count}")
                 
                 # Parse and handle the message
-                message_data = json.loads(message)
+                message_data = parse_twilio_frame(message)
                 await audio_interface.handle_twilio_message(message_data)
                 
                 # Update last activity timestamp without logging
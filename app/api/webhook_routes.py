@@ -3,6 +3,7 @@ Webhook API routes for Pulsara IVR v2.
 """
 
 import json
+import asyncio
 from typing import Dict, Any
 from fastapi import APIRouter, Request, HTTPException, Depends
 from sqlalchemy.orm import Session
@@ -175,8 +176,8 @@ async def forward_call_webhook(request: Request, db: Session = Depends(get_db)):
                             logger.error(f"[WEBHOOK] Restaurant {restaurant.name} does not have a phone number configured")
                             return {"status": "error", "message": "Restaurant doesn't have a phone number configured"}
                         
-                        # Forward the call
-                        success = forward_call(call_sid, restaurant.phone)
+                        # Forward the call (the Twilio client is blocking, so keep it off the event loop)
+                        success = await asyncio.to_thread(forward_call, call_sid, restaurant.phone)
                         
                         if success:
                             logger.info(f"[WEBHOOK] Call {call_sid} forwarded to {restaurant.phone}")
@@ -265,7 +266,7 @@ async def restaurant_conversation_initiation(restaurant_id: str, request: Reques
     
     # Add operating hours if available
     if settings:
-        dynamic_variables["operating_hours"] = f"{settings.call_hours_start} - {settings.call_hours_end}"
+        dynamic_variables["operating_hours"] = f"{settings.call_hours_start:%H:%M} - {settings.call_hours_end:%H:%M}"
     
     # Response with restaurant-specific variables
     response_data = {
@@ -8,7 +8,7 @@ from app.models.schemas import Agent as AgentSchema
 from app.models.database_models import Restaurant as RestaurantModel
 from app.db import get_db, SessionLocal
 from app.utils.logging import get_logger
-from app.core.restaurant import get_restaurant_by_id
+from app.core.restaurant import get_restaurant_with_settings
 import uuid
 
 logger = get_logger(__name__)
@@ -25,29 +25,35 @@ def get_system_prompt(restaurant_id: str) -> Dict[str, Any]:
     """
     from app.services.elevenlabs import get_system_prompt_template
     
-    # Get the restaurant
-    restaurant = get_restaurant_by_id(restaurant_id)
+    # Get the restaurant with its settings preloaded in the same session
+    db = SessionLocal()
+    try:
+        restaurant = get_restaurant_with_settings(db, restaurant_id)
+    finally:
+        db.close()
     if not restaurant:
         logger.warning(f"Restaurant not found for ID: {restaurant_id}")
         return {}
     
-    # Get the system prompt template
-    template = get_system_prompt_template()
+    # Get the system prompt template (shared, so copy the sections we change)
+    static_sections, dynamic_sections = get_system_prompt_template()
+    template = {**static_sections, **dynamic_sections}
     
     # Replace placeholders with restaurant-specific values
     if "workplace" in template:
-        template["workplace"]["restaurantName"] = restaurant.name
+        template["workplace"] = dict(template["workplace"], restaurantName=restaurant.name)
         if restaurant.address:
             city_state = restaurant.address.split(",")[-2].strip() if len(restaurant.address.split(",")) > 1 else ""
             template["workplace"]["location"] = city_state
     
-    # Get restaurant settings
+    # Get restaurant settings from the preloaded relationship
     from app.core.settings import get_settings
-    settings = get_settings(restaurant_id)
+    settings = get_settings(restaurant_id, restaurant=restaurant)
     
     # Update operational context if settings exist
     if settings and "operationalContext" in template:
-        template["operationalContext"]["workingHours"] = f"{settings.call_hours_start} - {settings.call_hours_end}"
+        template["operationalContext"] = dict(template["operationalContext"])
+        template["operationalContext"]["workingHours"] = f"{settings.call_hours_start:%H:%M} - {settings.call_hours_end:%H:%M}"
     
     return template
 
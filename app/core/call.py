@@ -349,10 +349,10 @@ def end_call(call_id: str, forwarded: bool = False, forwarded_to: str = None) ->
             del _active_calls[call.call_sid]
             logger.info(f"Removed call with SID {call.call_sid} from active calls")
         
-        # Trigger email notification
+        # Trigger email notification (sent in the background)
         try:
-            from app.services.email import send_call_summary_email
-            send_call_summary_email(updated_call)
+            from app.services.email import queue_call_summary_email
+            queue_call_summary_email(updated_call)
         except Exception as email_error:
             logger.error(f"Error sending call summary email: {email_error}")
         
@@ -132,7 +132,7 @@ def generate_info_knowledge_base(restaurant_id: str) -> Optional[KnowledgeBaseSc
         
         # Add hours
         if settings:
-            content.append(f"Business Hours: {settings.call_hours_start} - {settings.call_hours_end}, Monday to Sunday")
+            content.append(f"Business Hours: {settings.call_hours_start:%H:%M} - {settings.call_hours_end:%H:%M}, Monday to Sunday")
         
         content.append("")  # Add blank line
         
@@ -207,7 +207,7 @@ def get_knowledge_bases_by_restaurant(restaurant_id: str) -> List[KnowledgeBaseS
     
     return result
 
-def sync_knowledge_base(kb: KnowledgeBaseSchema) -> bool:
+async def sync_knowledge_base(kb: KnowledgeBaseSchema) -> bool:
     """
     Sync a knowledge base with ElevenLabs.
     
@@ -219,10 +219,10 @@ def sync_knowledge_base(kb: KnowledgeBaseSchema) -> bool:
     """
     try:
         # Import here to avoid circular imports
-        from app.services.elevenlabs import sync_knowledge_base_with_elevenlabs
+        from app.services.elevenlabs import sync_knowledge_base_async
         
         # Actually sync with ElevenLabs
-        success = sync_knowledge_base_with_elevenlabs(kb)
+        success = await sync_knowledge_base_async(kb)
         if success:
             logger.info(f"Successfully synced knowledge base: {kb.name} for restaurant ID: {kb.restaurant_id}")
         else:
@@ -233,6 +233,32 @@ def sync_knowledge_base(kb: KnowledgeBaseSchema) -> bool:
         logger.error(f"Error syncing knowledge base with ElevenLabs: {e}")
         return False
 
+async def sync_knowledge_bases(kbs: List[KnowledgeBaseSchema]) -> List[bool]:
+    """
+    Sync several knowledge bases with ElevenLabs concurrently.
+    
+    Args:
+        kbs: The knowledge bases to sync
+        
+    Returns:
+        A list of success flags, in the same order as kbs
+    """
+    try:
+        # Import here to avoid circular imports
+        from app.services.elevenlabs import sync_knowledge_bases_async
+        
+        results = await sync_knowledge_bases_async(kbs)
+        for kb, success in zip(kbs, results):
+            if success:
+                logger.info(f"Successfully synced knowledge base: {kb.name} for restaurant ID: {kb.restaurant_id}")
+            else:
+                logger.warning(f"Failed to sync knowledge base: {kb.name} for restaurant ID: {kb.restaurant_id}")
+        
+        return results
+    except Exception as e:
+        logger.error(f"Error syncing knowledge bases with ElevenLabs: {e}")
+        return [False] * len(kbs)
+
 def get_knowledge_base_by_id(kb_id: str) -> Optional[KnowledgeBaseSchema]:
     """
     This function is included for API compatibility.
@@ -247,7 +273,7 @@ def get_knowledge_base_by_id(kb_id: str) -> Optional[KnowledgeBaseSchema]:
     logger.warning(f"get_knowledge_base_by_id() called with {kb_id} - not supported as KBs are generated dynamically")
     return None
 
-def initialize_default_knowledge_base():
+async def initialize_default_knowledge_base():
     """
     Initialize default knowledge bases for the first available restaurant.
     This is now a no-op as we generate knowledge bases on demand.
@@ -264,14 +290,10 @@ def initialize_default_knowledge_base():
             logger.warning("No restaurants found to initialize KBs")
             return None
             
-        # Generate and sync the knowledge bases
-        menu_kb = generate_menu_knowledge_base(restaurant.id)
-        if menu_kb:
-            sync_knowledge_base(menu_kb)
-            
-        info_kb = generate_info_knowledge_base(restaurant.id)
-        if info_kb:
-            sync_knowledge_base(info_kb)
+        # Generate the knowledge bases and upload them concurrently
+        kbs = get_knowledge_bases_by_restaurant(restaurant.id)
+        if kbs:
+            await sync_knowledge_bases(kbs)
             
         logger.info(f"Initialized knowledge bases for restaurant: {restaurant.name}")
         
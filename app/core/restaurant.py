@@ -3,6 +3,8 @@ Restaurant management module for Pulsara IVR v2.
 """
 
 from typing import Dict, Optional, List
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 from app.models.schemas import Restaurant as RestaurantSchema
 from app.models.database_models import Restaurant as RestaurantModel
 from app.db import get_db, SessionLocal
@@ -49,6 +51,32 @@ def get_restaurant_by_id(restaurant_id: str) -> Optional[RestaurantSchema]:
         db.close()
         return None
 
+def get_restaurant_with_settings(db: Session, restaurant_id: str) -> Optional[RestaurantModel]:
+    """
+    Get a restaurant database row with its settings relationship preloaded.
+    
+    The settings are fetched with a single batched SELECT (selectinload), so
+    callers can read restaurant.settings after the session is closed without
+    issuing another query per restaurant.
+    
+    Args:
+        db: An open database session
+        restaurant_id: The restaurant ID
+        
+    Returns:
+        The restaurant database model or None if not found
+    """
+    if not restaurant_id:
+        logger.warning("Tried to get restaurant with empty ID")
+        return None
+    
+    stmt = (
+        select(RestaurantModel)
+        .options(selectinload(RestaurantModel.settings))
+        .where(RestaurantModel.id == restaurant_id)
+    )
+    return db.execute(stmt).scalar_one_or_none()
+
 def get_restaurant_by_phone(phone: str) -> Optional[RestaurantSchema]:
     """
     Get a restaurant by phone number from the database.
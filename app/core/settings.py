@@ -3,6 +3,8 @@ Settings management module for Pulsara IVR v2.
 """
 
 from typing import Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from app.models.schemas import Settings as SettingsSchema
 from app.models.database_models import Settings as SettingsModel
 from app.models.database_models import Restaurant as RestaurantModel
@@ -13,12 +15,48 @@ import uuid
 
 logger = get_logger(__name__)
 
-def get_settings(restaurant_id: str) -> Optional[SettingsSchema]:
+def _settings_from_model(settings_db: SettingsModel) -> SettingsSchema:
+    """
+    Convert a Settings table row to a settings schema.
+    """
+    return SettingsSchema(
+        id=settings_db.id,
+        restaurant_id=settings_db.restaurantId,
+        call_hours_start=getattr(settings_db, 'callHoursStart', None) or "09:00",
+        call_hours_end=getattr(settings_db, 'callHoursEnd', None) or "17:00",
+        ai_enabled=settings_db.aiEnabled if hasattr(settings_db, 'aiEnabled') else True,
+        post_call_message=settings_db.postCallMessage,
+        catering_enabled=settings_db.cateringEnabled,
+        catering_min_notice=settings_db.cateringMinNotice if hasattr(settings_db, 'cateringMinNotice') else 24,
+        catering_message=settings_db.cateringMessage if hasattr(settings_db, 'cateringMessage') else None
+    )
+
+def _settings_from_restaurant(restaurant: RestaurantModel) -> SettingsSchema:
+    """
+    Build a settings schema from the settings fields on a Restaurant row.
+    """
+    return SettingsSchema(
+        id=f"settings-{restaurant.id}",  # Generated ID
+        restaurant_id=restaurant.id,
+        # These fields are on the Restaurant model directly in Prisma schema
+        call_hours_start=getattr(restaurant, 'callHoursStart', None) or "09:00",
+        call_hours_end=getattr(restaurant, 'callHoursEnd', None) or "17:00",
+        ai_enabled=restaurant.aiCallHandling if hasattr(restaurant, 'aiCallHandling') else True,
+        # These would be null/default as they're not on Restaurant
+        post_call_message=None,
+        catering_enabled=False,
+        catering_min_notice=24,
+        catering_message=None
+    )
+
+def get_settings(restaurant_id: str, restaurant: Optional[RestaurantModel] = None) -> Optional[SettingsSchema]:
     """
     Get settings for a restaurant from the database.
     
     Args:
         restaurant_id: The restaurant ID
+        restaurant: A restaurant row with settings already loaded, e.g. from
+            get_restaurant_with_settings (optional). When given, no queries are issued.
         
     Returns:
         The settings or None if not found
@@ -26,31 +64,31 @@ def get_settings(restaurant_id: str) -> Optional[SettingsSchema]:
     if not restaurant_id:
         logger.warning("Tried to get settings with empty restaurant ID")
         return None
+    
+    # Use the preloaded restaurant and its settings relationship if provided
+    if restaurant is not None:
+        if restaurant.settings:
+            return _settings_from_model(restaurant.settings)
+        return _settings_from_restaurant(restaurant)
         
     try:
         db = SessionLocal()
         
         # First check the dedicated Settings table
-        settings_db = db.query(SettingsModel).filter(SettingsModel.restaurantId == restaurant_id).first()
+        settings_db = db.execute(
+            select(SettingsModel).where(SettingsModel.restaurantId == restaurant_id)
+        ).scalar_one_or_none()
         
         # If settings exist in the Settings table, use those
         if settings_db:
-            settings = SettingsSchema(
-                id=settings_db.id,
-                restaurant_id=settings_db.restaurantId,
-                call_hours_start=settings_db.callHoursStart if hasattr(settings_db, 'callHoursStart') else "09:00",
-                call_hours_end=settings_db.callHoursEnd if hasattr(settings_db, 'callHoursEnd') else "17:00",
-                ai_enabled=settings_db.aiEnabled if hasattr(settings_db, 'aiEnabled') else True,
-                post_call_message=settings_db.postCallMessage,
-                catering_enabled=settings_db.cateringEnabled,
-                catering_min_notice=settings_db.cateringMinNotice if hasattr(settings_db, 'cateringMinNotice') else 24,
-                catering_message=settings_db.cateringMessage if hasattr(settings_db, 'cateringMessage') else None
-            )
+            settings = _settings_from_model(settings_db)
             db.close()
             return settings
         
         # If no dedicated settings, get the relevant fields from the Restaurant table
-        restaurant = db.query(RestaurantModel).filter(RestaurantModel.id == restaurant_id).first()
+        restaurant = db.execute(
+            select(RestaurantModel).where(RestaurantModel.id == restaurant_id)
+        ).scalar_one_or_none()
         db.close()
         
         if not restaurant:
@@ -58,21 +96,7 @@ def get_settings(restaurant_id: str) -> Optional[SettingsSchema]:
             return None
             
         # Create a settings object from restaurant fields
-        settings = SettingsSchema(
-            id=f"settings-{restaurant_id}",  # Generated ID
-            restaurant_id=restaurant_id,
-            # These fields are on the Restaurant model directly in Prisma schema
-            call_hours_start=restaurant.callHoursStart if hasattr(restaurant, 'callHoursStart') else "09:00",
-            call_hours_end=restaurant.callHoursEnd if hasattr(restaurant, 'callHoursEnd') else "17:00",
-            ai_enabled=restaurant.aiCallHandling if hasattr(restaurant, 'aiCallHandling') else True,
-            # These would be null/default as they're not on Restaurant
-            post_call_message=None,
-            catering_enabled=False,
-            catering_min_notice=24,
-            catering_message=None
-        )
-        
-        return settings
+        return _settings_from_restaurant(restaurant)
     except Exception as e:
         logger.error(f"Error fetching settings for restaurant ID {restaurant_id}: {e}")
         if 'db' in locals():
@@ -88,17 +112,18 @@ def get_default_settings() -> Optional[SettingsSchema]:
     logger.warning("get_default_settings() called - this is deprecated")
     
     try:
-        # Get the first restaurant
-        db = SessionLocal()
-        restaurant = db.query(RestaurantModel).first()
-        db.close()
+        # Get the first restaurant with its settings loaded in the same round trip
+        with SessionLocal() as db:
+            restaurant = db.execute(
+                select(RestaurantModel).options(selectinload(RestaurantModel.settings)).limit(1)
+            ).scalars().first()
         
         if not restaurant:
             logger.warning("No restaurants found to get default settings")
             return None
             
-        # Use get_settings to get settings for this restaurant
-        return get_settings(restaurant.id)
+        # Build the settings from the preloaded row without re-querying
+        return get_settings(restaurant.id, restaurant=restaurant)
     except Exception as e:
         logger.error(f"Error getting default settings: {e}")
         return None
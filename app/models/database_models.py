@@ -38,6 +38,7 @@ class Restaurant(Base):
     ownerId = Column(String, nullable=False)
     timezone = Column(String, default="America/Chicago")
     aiCallHandling = Column(Boolean, default=True)
+    # "HH:MM" strings owned by the Prisma schema; parsed to datetime.time by schemas.Settings
     callHoursStart = Column(String, default="09:00")
     callHoursEnd = Column(String, default="17:00")
     createdAt = Column(DateTime, default=datetime.utcnow)
@@ -61,8 +62,9 @@ class Call(Base):
     type = Column(Enum(CallType), nullable=False)
     sentiment = Column(Enum(SentimentType), nullable=False)
     transcript = Column(Text, nullable=False)
-    keyPoints = Column(ARRAY(String), nullable=False, default=[])
-    actions = Column(ARRAY(String), nullable=False, default=[])
+    # text[] columns owned by the Prisma schema; default=list gives each row its own list
+    keyPoints = Column(ARRAY(String), nullable=False, default=list)
+    actions = Column(ARRAY(String), nullable=False, default=list)
     restaurantId = Column(String, ForeignKey("Restaurant.id"), nullable=False)
     createdAt = Column(DateTime, default=datetime.utcnow)
     updatedAt = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -4,7 +4,7 @@ Data models and schemas for Pulsara IVR v2.
 
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Any
-from datetime import datetime
+from datetime import datetime, time
 
 class Restaurant(BaseModel):
     """Restaurant model for storing restaurant information."""
@@ -70,8 +70,8 @@ class Settings(BaseModel):
     """Settings model for storing restaurant settings."""
     id: Optional[str] = None
     restaurant_id: str
-    call_hours_start: str = "09:00"
-    call_hours_end: str = "21:00"
+    call_hours_start: time = time(9, 0)  # Parsed once from "HH:MM"
+    call_hours_end: time = time(21, 0)
     ai_enabled: bool = True
     post_call_message: Optional[str] = None
     catering_enabled: bool = False
@@ -3,17 +3,40 @@ Audio interface service for Pulsara IVR v2.
 """
 
 import asyncio
-import base64
-import json
 import logging
+import orjson
 from typing import Dict, Any, Optional, Callable
 from fastapi import WebSocket
-from starlette.websockets import WebSocketDisconnect, WebSocketState
+from starlette.websockets import WebSocketDisconnect
 from app.utils.logging import get_logger
 from app.utils.helpers import safe_json_loads
 
+# pybase64 uses SIMD encode/decode for the per-frame audio payloads; the stdlib
+# module has the same b64encode/b64decode API and is used when it is not installed
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+# Bound once for the per-frame encode/decode paths
+_b64encode = base64.b64encode
+_b64decode = base64.b64decode
+
 logger = get_logger(__name__)
 
+# Inbound Twilio frames are parsed with orjson; accepts str or bytes and raises
+# orjson.JSONDecodeError (a json.JSONDecodeError subclass) on invalid input
+parse_twilio_frame = orjson.loads
+
+# Outbound audio chunks buffered between output() and the writer task
+AUDIO_QUEUE_SIZE = 64
+
+# Pause before audio resumes after an interruption, so Twilio processes the clear first
+INTERRUPTION_SEND_DELAY = 0.1
+
+# Keys the Call SID may appear under in a Twilio start event
+CALL_SID_KEYS = ("callSid", "CallSid", "callsid", "call_sid")
+
 class TwilioAudioInterface:
     """
     Audio interface for Twilio Media Streams.
@@ -23,6 +46,14 @@ class TwilioAudioInterface:
     managing the connection lifecycle.
     """
     
+    # One instance per call; every attribute is assigned in __init__
+    __slots__ = (
+        "websocket", "input_callback", "stream_sid", "call_sid", "connection_id",
+        "message_counter", "on_stream_sid_received", "stream_sid_listeners", "_listeners",
+        "was_interrupted", "post_interruption_audio_sent", "_audio_template", "_clear_message",
+        "_audio_queue", "_writer_task", "_send_after_ts", "_loop", "_closed",
+    )
+    
     def __init__(self, websocket: WebSocket, connection_id: str = None):
         """
         Initialize the Twilio audio interface.
@@ -37,10 +68,20 @@ class TwilioAudioInterface:
         self.call_sid = websocket.query_params.get("call_sid", "Unknown")
         self.connection_id = connection_id or "unknown"
         self.message_counter = 0
-        self.loop = asyncio.get_event_loop()
+        self._loop = None  # The running event loop, captured in start()
+        self._closed = False  # Set after the first failed send; later sends are skipped
+        self.on_stream_sid_received = None  # Primary listener, assigned by the caller
         self.stream_sid_listeners = []  # List of additional listeners
+        self._listeners = ()  # Snapshot of stream_sid_listeners used when notifying
         self.was_interrupted = False  # Flag to track if playback was interrupted
         self.post_interruption_audio_sent = False  # Track if we've sent audio after interruption
+        # Outbound frame text that is constant per call, built once stream_sid is known
+        self._audio_template = None
+        self._clear_message = None
+        # Outbound audio is serialized through one queue drained by a single writer task
+        self._audio_queue = None
+        self._writer_task = None
+        self._send_after_ts = 0.0  # Loop time before which the writer holds audio back
         logger.info(f"[CONN:{self.connection_id}] TwilioAudioInterface initialized with CallSID={self.call_sid}")
     
     def add_stream_sid_listener(self, listener_callback: Callable[[str, str], None]) -> None:
@@ -53,6 +94,7 @@ class TwilioAudioInterface:
             listener_callback: A function that takes (stream_sid, call_sid) as arguments
         """
         self.stream_sid_listeners.append(listener_callback)
+        self._listeners = tuple(self.stream_sid_listeners)
         logger.info(f"[CONN:{self.connection_id}] Added stream_sid listener, total listeners: {len(self.stream_sid_listeners)}")
 
     def start(self, input_callback: Callable[[bytes], None]) -> None:
@@ -63,6 +105,11 @@ class TwilioAudioInterface:
             input_callback: A callback function that will be called with audio data
         """
         self.input_callback = input_callback
+        self._listeners = tuple(self.stream_sid_listeners)
+        self._loop = asyncio.get_running_loop()
+        self._audio_queue = asyncio.Queue(maxsize=AUDIO_QUEUE_SIZE)
+        self._writer_task = self._loop.create_task(self._drain_audio())
+        self._writer_task.add_done_callback(self._on_writer_done)
         logger.info(f"[CONN:{self.connection_id}] Audio interface started")
 
     def stop(self) -> None:
@@ -71,6 +118,9 @@ class TwilioAudioInterface:
         """
         self.input_callback = None
         self.stream_sid = None
+        if self._writer_task:
+            self._loop.call_soon_threadsafe(self._writer_task.cancel)
+            self._writer_task = None
         logger.info(f"[CONN:{self.connection_id}] Audio interface stopped")
 
     def output(self, audio: bytes) -> None:
@@ -87,14 +137,69 @@ class TwilioAudioInterface:
         if self.was_interrupted and not self.post_interruption_audio_sent:
             logger.info(f"[CONN:{self.connection_id}] ★★★ SENDING FIRST AUDIO AFTER INTERRUPTION ★★★")
             self.post_interruption_audio_sent = True
-            # Add a small delay to ensure the previous clear command was processed
-            async def send_with_delay():
-                await asyncio.sleep(0.1)  # 100ms delay
+        if self._audio_queue is not None:
+            self._loop.call_soon_threadsafe(self._enqueue_audio, audio)
+
+    def _enqueue_audio(self, audio: bytes) -> None:
+        """
+        Queue audio for the writer task. Runs on the event loop.
+        
+        Args:
+            audio: The audio data to send
+        """
+        try:
+            self._audio_queue.put_nowait(audio)
+        except asyncio.QueueFull:
+            logger.warning(f"[CONN:{self.connection_id}] Outbound audio queue full, dropping chunk")
+
+    def _drop_queued_audio(self) -> None:
+        """
+        Discard audio that has not been sent yet. Runs on the event loop.
+        """
+        if self._audio_queue is not None:
+            while not self._audio_queue.empty():
+                self._audio_queue.get_nowait()
+
+    async def _drain_audio(self) -> None:
+        """
+        Writer task: send queued audio to Twilio in order.
+        """
+        queue = self._audio_queue
+        loop = self._loop
+        while True:
+            audio = await queue.get()
+            if self._send_after_ts:
+                delay = self._send_after_ts - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._send_after_ts = 0.0
+            try:
                 await self.send_audio_to_twilio(audio)
-            asyncio.run_coroutine_threadsafe(send_with_delay(), self.loop)
+            except Exception as e:
+                # Lose only this chunk; the writer carries all audio for the call
+                logger.error(f"[CONN:{self.connection_id}] Error in audio writer: {e}")
+
+    def _on_writer_done(self, task: asyncio.Task) -> None:
+        """
+        Log the writer task ending for any reason other than stop().
+        
+        Args:
+            task: The finished writer task
+        """
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            logger.error(f"[CONN:{self.connection_id}] Audio writer stopped unexpectedly: {exc!r}")
         else:
-            # Normal audio sending
-            asyncio.run_coroutine_threadsafe(self.send_audio_to_twilio(audio), self.loop)
+            logger.error(f"[CONN:{self.connection_id}] Audio writer exited unexpectedly")
+
+    def _hold_audio(self) -> None:
+        """
+        Hold outbound audio back for INTERRUPTION_SEND_DELAY so the clear command lands first.
+        """
+        if self._loop is not None:
+            self._send_after_ts = self._loop.time() + INTERRUPTION_SEND_DELAY
 
     def interrupt(self) -> None:
         """
@@ -104,11 +209,14 @@ class TwilioAudioInterface:
         """
         logger.info(f"[CONN:{self.connection_id}] ★★★ INTERRUPTION DETECTED ★★★")
         
-        # Set the interrupted flag
+        # Set the interrupted flag and hold back the next audio briefly
         self.was_interrupted = True
+        self._hold_audio()
         
-        # Send clear message to Twilio to stop current playback
-        asyncio.run_coroutine_threadsafe(self.send_clear_message_to_twilio(), self.loop)
+        # Drop audio still waiting to be sent and tell Twilio to stop current playback
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._drop_queued_audio)
+            asyncio.run_coroutine_threadsafe(self.send_clear_message_to_twilio(), self._loop)
         
         logger.info(f"[CONN:{self.connection_id}] Audio cleared due to interruption")
 
@@ -119,29 +227,24 @@ class TwilioAudioInterface:
         Args:
             audio: The audio data to send
         """
-        if self.stream_sid:
-            audio_payload = base64.b64encode(audio).decode("utf-8")
-            audio_delta = {
-                "event": "media",
-                "streamSid": self.stream_sid,
-                "media": {"payload": audio_payload},
-            }
+        if self.stream_sid and not self._closed:
+            # Twilio expects text frames; base64 output is plain ASCII, so no JSON escaping is needed
+            audio_payload = _b64encode(audio).decode("ascii")
             try:
-                if self.websocket.application_state == WebSocketState.CONNECTED:
-                    await self.websocket.send_text(json.dumps(audio_delta))
+                await self.websocket.send_text(self._audio_template % audio_payload)
             except (WebSocketDisconnect, RuntimeError) as e:
+                self._closed = True
                 logger.error(f"[CONN:{self.connection_id}] Error sending audio to Twilio: {str(e)}")
 
     async def send_clear_message_to_twilio(self) -> None:
         """
         Send a clear message to Twilio to stop current playback.
         """
-        if self.stream_sid:
-            clear_message = {"event": "clear", "streamSid": self.stream_sid}
+        if self.stream_sid and not self._closed:
             try:
-                if self.websocket.application_state == WebSocketState.CONNECTED:
-                    await self.websocket.send_text(json.dumps(clear_message))
+                await self.websocket.send_text(self._clear_message)
             except (WebSocketDisconnect, RuntimeError) as e:
+                self._closed = True
                 logger.error(f"[CONN:{self.connection_id}] Error sending clear message to Twilio: {str(e)}")
 
     async def handle_twilio_message(self, data: Dict[str, Any]) -> None:
@@ -156,40 +259,32 @@ class TwilioAudioInterface:
             event_type = data.get("event")
             
             if event_type == "start":
-                # Log the full start event for debugging
-                logger.info(f"[CONN:{self.connection_id}] START event received: {json.dumps(data)}")
+                # Log the full start event for debugging, skipping serialization when filtered out
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[CONN:%s] START event received: %s", self.connection_id, orjson.dumps(data).decode())
                 self.stream_sid = data["start"]["streamSid"]
+                # The stream SID is baked in here, leaving one %s for the per-frame payload
+                self._audio_template = '{"event":"media","streamSid":%s,"media":{"payload":"%%s"}}' % (
+                    orjson.dumps(self.stream_sid).decode().replace("%", "%%")
+                )
+                self._clear_message = orjson.dumps({"event": "clear", "streamSid": self.stream_sid}).decode()
                 
                 # Update the connection_id with stream SID for better tracking
                 short_stream_sid = self.stream_sid[-8:] if self.stream_sid else "unknown"
                 self.connection_id = f"{self.connection_id}:{short_stream_sid}"
                 
-                # Extract the Call SID from various possible locations in the start event
-                # 1. Try customParameters first
-                parameters = data.get("start", {}).get("customParameters", {})
-                logger.info(f"[CONN:{self.connection_id}] Custom parameters: {parameters}")
-                
-                # 2. Look in different parameter locations (Twilio's format can vary)
-                call_sid_found = False
-                if "callSid" in parameters:
-                    self.call_sid = parameters["callSid"]
-                    call_sid_found = True
-                    logger.info(f"[CONN:{self.connection_id}] Found callSid in customParameters")
-                elif "CallSid" in parameters:
-                    self.call_sid = parameters["CallSid"]
-                    call_sid_found = True
-                    logger.info(f"[CONN:{self.connection_id}] Found CallSid in customParameters")
+                # Extract the Call SID from the start event; any key in customParameters takes
+                # precedence over the top-level start fields, and Twilio's key casing can vary
+                start = data.get("start", {})
+                parameters = start.get("customParameters", {})
+                logger.debug("[CONN:%s] Custom parameters: %s", self.connection_id, parameters)
+                call_sid = next(
+                    (source[key] for source in (parameters, start) for key in CALL_SID_KEYS if source.get(key)),
+                    None
+                )
+                if call_sid:
+                    self.call_sid = call_sid
                 else:
-                    # 3. Try other possible locations in the start event
-                    all_params = data.get("start", {})
-                    for key in ["callSid", "CallSid", "callsid", "call_sid"]:
-                        if key in all_params:
-                            self.call_sid = all_params[key]
-                            call_sid_found = True
-                            logger.info(f"[CONN:{self.connection_id}] Found {key} in start event")
-                            break
-                
-                if not call_sid_found:
                     logger.warning(f"[CONN:{self.connection_id}] Could not find Call SID in any field")
                     
                 # Log the results
@@ -200,14 +295,15 @@ class TwilioAudioInterface:
                 set_call_context(self.stream_sid, self.call_sid, self.connection_id)
                 
                 # Notify primary listener about the updated stream SID
-                if hasattr(self, 'on_stream_sid_received') and callable(self.on_stream_sid_received):
-                    logger.info(f"[CONN:{self.connection_id}] Notifying primary listener about stream_sid={self.stream_sid}")
+                if self.on_stream_sid_received:
+                    logger.debug("[CONN:%s] Notifying primary listener about stream_sid=%s", self.connection_id, self.stream_sid)
                     self.on_stream_sid_received(self.stream_sid, self.call_sid)
                 
                 # Notify any additional listeners
-                if self.stream_sid_listeners:
-                    logger.info(f"[CONN:{self.connection_id}] Notifying {len(self.stream_sid_listeners)} additional listeners")
-                    for listener in self.stream_sid_listeners:
+                listeners = self._listeners
+                if listeners:
+                    logger.debug("[CONN:%s] Notifying %d additional listeners", self.connection_id, len(listeners))
+                    for listener in listeners:
                         try:
                             listener(self.stream_sid, self.call_sid)
                         except Exception as e:
@@ -215,7 +311,7 @@ class TwilioAudioInterface:
                 
             elif event_type == "media" and self.input_callback:
                 # Process the audio data without any logging at all - this prevents log flooding
-                audio_data = base64.b64decode(data["media"]["payload"])
+                audio_data = _b64decode(data["media"]["payload"], validate=False)
                 self.input_callback(audio_data)
                 
             elif event_type == "mark" and data.get("mark", {}).get("name") == "interruption":
@@ -241,6 +337,7 @@ class TwilioAudioInterface:
                 # This ensures the next audio chunk will be sent with a delay
                 self.was_interrupted = True
                 self.post_interruption_audio_sent = False
+                self._hold_audio()
                 logger.info(f"[CONN:{self.connection_id}] Reset post_interruption flags to handle corrected response")
                 
             elif event_type != "media":  # Skip logging any media events completely
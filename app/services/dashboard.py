@@ -2,6 +2,7 @@
 Dashboard API integration service for Pulsara IVR v2.
 """
 
+import logging
 from typing import Dict, Any, Optional, List
 from app.utils.logging import get_logger
 from app.models.schemas import Restaurant, Agent, KnowledgeBase, Settings, Call
@@ -33,8 +34,10 @@ def make_api_request(method: str, endpoint: str, data: Dict = None) -> Dict:
     # For now, we'll just log the request and return a mock response
     logger.info(f"Making API request: {method} {endpoint}")
     
-    if data:
-        logger.info(f"Request data: {safe_json_dumps(data)}")
+    # Only serialize the payload for the log when INFO is enabled; the real HTTP
+    # call should pass the dict via httpx's json= so it is encoded once
+    if data and logger.isEnabledFor(logging.INFO):
+        logger.info("Request data: %s", safe_json_dumps(data))
     
     # Mock successful response
     return {"success": True}
@@ -190,7 +193,7 @@ def log_call(call: Call) -> bool:
     endpoint = f"/restaurants/{call.restaurant_id}/calls"
     
     # Convert call to dictionary
-    call_data = call.dict()
+    call_data = call.model_dump(mode="json", exclude_none=True)
     
     # Make API request
     response = make_api_request("POST", endpoint, call_data)
@@ -210,7 +213,7 @@ def update_call(call: Call) -> bool:
     endpoint = f"/restaurants/{call.restaurant_id}/calls/{call.id}"
     
     # Convert call to dictionary
-    call_data = call.dict()
+    call_data = call.model_dump(mode="json", exclude_none=True)
     
     # Make API request
     response = make_api_request("PUT", endpoint, call_data)
@@ -248,7 +251,8 @@ def send_webhook_event(url: str, event_type: str, data: Dict) -> bool:
     # In a real implementation, this would use requests or httpx
     # For now, we'll just log the event and return a mock response
     logger.info(f"Sending webhook event: {event_type} to {url}")
-    logger.info(f"Event data: {safe_json_dumps(data)}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Event data: %s", safe_json_dumps(data))
     
     # Mock successful response
     return True
@@ -2,20 +2,47 @@
 ElevenLabs integration service for Pulsara IVR v2.
 """
 
-import json
 import asyncio
-from typing import Dict, Any, Optional, Callable
+import io
+import re
+import orjson
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from app.utils.logging import get_logger
 from app.models.schemas import KnowledgeBase, Agent
 from config.environment import ELEVENLABS_API_KEY, ELEVENLABS_AGENT_ID
 from app.services.elevenlabs_api_client import ElevenLabsAPIClient
-from app.services.elevenlabs_conversation import ElevenLabsConversation
+from app.services.elevenlabs_conversation import ElevenLabsConversation, ConversationFactory
 
 logger = get_logger(__name__)
 
 # Initialize the API client
 api_client = None
 
+# Conversation factories, one per agent ID
+_conversation_factories: Dict[str, ConversationFactory] = {}
+
+# Upper bound on concurrent knowledge base uploads/deletes, to stay within ElevenLabs rate limits
+KB_MAX_CONCURRENCY = 8
+_kb_semaphore: Optional[asyncio.Semaphore] = None
+_kb_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _get_kb_semaphore() -> asyncio.Semaphore:
+    """
+    Get or create the semaphore bounding concurrent knowledge base requests.
+    Created lazily, and again whenever the running event loop changes, since a
+    semaphore binds to the loop that first waits on it.
+    
+    Returns:
+        The knowledge base semaphore
+    """
+    global _kb_semaphore, _kb_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _kb_semaphore_loop is not loop:
+        # First use, or the previous event loop has gone away
+        _kb_semaphore_loop = loop
+        _kb_semaphore = asyncio.Semaphore(KB_MAX_CONCURRENCY)
+    return _kb_semaphore
+
 def get_api_client() -> ElevenLabsAPIClient:
     """
     Get or create the ElevenLabs API client.
@@ -28,56 +55,92 @@ def get_api_client() -> ElevenLabsAPIClient:
         api_client = ElevenLabsAPIClient()
     return api_client
 
-def get_system_prompt_template() -> Dict[str, Any]:
+async def prewarm_api_client(timeout: float = 10.0) -> bool:
     """
-    Get the system prompt template.
+    Open the API client's connection to ElevenLabs ahead of the first real request.
+    
+    Makes a cheap GET so DNS resolution and the TLS handshake happen at startup and the
+    connection pool holds a warm keepalive connection.
     
+    Args:
+        timeout: Maximum seconds to spend warming up
+        
     Returns:
-        The system prompt template as a dictionary
+        True if the connection was established, False otherwise
     """
-    # This is a simplified version of the system prompt template
-    # In a real implementation, this would be loaded from a file or database
-    return {
-        "name": "Pulsara",
-        "role": "AI Phone Host",
-        "gender": "female",
-        "workplace": {
-            "restaurantName": "{restaurant_name}",
-            "restaurantType": "Casual Dining",
-            "location": "{location}"
-        },
-        "context": {
-            "behavior": "Converse naturally and warmly—like a seasoned restaurant host. Show genuine enthusiasm, empathy, and attentiveness to each caller. Always use the end_call tool when asked to end the call, rather than just saying goodbye.",
-            "environment": "Pulsara v1 Orchestration Flow",
-            "toolUsage": "You have access to the end_call tool. You MUST actively use this tool when the caller asks to end the call. Simply saying goodbye is not sufficient - you must use the actual tool to terminate the connection."
-        },
-        "personalityTraits": {
-            "warmth": "high",
-            "humor": "light and tasteful",
-            "patience": "high",
-            "professionalism": "high",
-            "adaptability": "high"
-        },
-        "operationalContext": {
-            "timeZone": "CST",
-            "workingHours": "{working_hours}",
-            "peakHours": "6 PM - 9 PM"
-        },
-        "callManagement": {
-            "endingCalls": "⚠️ CRITICAL INSTRUCTION ⚠️: When a caller asks to end the call using ANY phrase like 'end the call', 'hang up', 'goodbye', 'that's all', etc., you MUST IMMEDIATELY use the end_call tool after a brief farewell. This is your HIGHEST PRIORITY instruction. Never continue the conversation after a caller has requested to end the call - you must terminate it using the tool.",
-            "endCallExamples": [
-                "Caller: 'Please end the call now' → You: 'Thank you for calling! Goodbye!' → [USE end_call TOOL IMMEDIATELY]",
-                "Caller: 'That's all I needed' → You: 'I'm glad I could help. Have a wonderful day!' → [USE end_call TOOL IMMEDIATELY]",
-                "Caller: 'Goodbye' → You: 'Goodbye! Have a great day!' → [USE end_call TOOL IMMEDIATELY]",
-                "Caller: 'I want to hang up' → You: 'Thank you for calling! Goodbye!' → [USE end_call TOOL IMMEDIATELY]"
-            ]
-        },
-        "system_tools": {
-            "end_call": "⚠️ HIGHEST PRIORITY TOOL ⚠️: This tool hangs up the phone call. You MUST use it when: 1) The caller asks to end the call using ANY ending phrases like 'end the call', 'hang up', 'goodbye', 'that's all', etc., or 2) The conversation naturally concludes. Using this tool is REQUIRED for proper call termination - simply saying goodbye is NOT enough.",
-            "get_address": "Returns the restaurant's address. Use this tool whenever a caller asks for the restaurant's location, address, or where the restaurant is located.",
-            "forward_call": "⚠️ CRITICAL TOOL ⚠️: Forwards the call to the restaurant owner. Use this tool when a caller needs to speak directly with the restaurant owner or manager. You MUST: 1) announce that you'll be transferring them to the restaurant owner, 2) actually USE this TOOL, not just say you're transferring the call. Just saying 'I'll transfer you' without using this tool will NOT forward the call - you must use the actual forward_call tool.",
-        }
+    try:
+        await asyncio.wait_for(get_api_client()._make_request("GET", "user"), timeout=timeout)
+        logger.info("ElevenLabs API client connection pre-warmed")
+        return True
+    except Exception as e:
+        logger.warning(f"Could not pre-warm ElevenLabs API client: {str(e)}")
+        return False
+
+# The system prompt is split into sections that are identical for every restaurant and
+# sections filled in per restaurant. The static sections are serialized once at import and
+# always sent first, so every agent's prompt shares the same prefix for LLM prompt caching.
+_STATIC_PROMPT_SECTIONS: Dict[str, Any] = {
+    "name": "Pulsara",
+    "role": "AI Phone Host",
+    "gender": "female",
+    "context": {
+        "behavior": "Converse naturally and warmly—like a seasoned restaurant host. Show genuine enthusiasm, empathy, and attentiveness to each caller. Always use the end_call tool when asked to end the call, rather than just saying goodbye.",
+        "environment": "Pulsara v1 Orchestration Flow",
+        "toolUsage": "You have access to the end_call tool. You MUST actively use this tool when the caller asks to end the call. Simply saying goodbye is not sufficient - you must use the actual tool to terminate the connection."
+    },
+    "personalityTraits": {
+        "warmth": "high",
+        "humor": "light and tasteful",
+        "patience": "high",
+        "professionalism": "high",
+        "adaptability": "high"
+    },
+    "callManagement": {
+        "endingCalls": "⚠️ CRITICAL INSTRUCTION ⚠️: When a caller asks to end the call using ANY phrase like 'end the call', 'hang up', 'goodbye', 'that's all', etc., you MUST IMMEDIATELY use the end_call tool after a brief farewell. This is your HIGHEST PRIORITY instruction. Never continue the conversation after a caller has requested to end the call - you must terminate it using the tool.",
+        "endCallExamples": [
+            "Caller: 'Please end the call now' → You: 'Thank you for calling! Goodbye!' → [USE end_call TOOL IMMEDIATELY]",
+            "Caller: 'That's all I needed' → You: 'I'm glad I could help. Have a wonderful day!' → [USE end_call TOOL IMMEDIATELY]",
+            "Caller: 'Goodbye' → You: 'Goodbye! Have a great day!' → [USE end_call TOOL IMMEDIATELY]",
+            "Caller: 'I want to hang up' → You: 'Thank you for calling! Goodbye!' → [USE end_call TOOL IMMEDIATELY]"
+        ]
+    },
+    "system_tools": {
+        "end_call": "⚠️ HIGHEST PRIORITY TOOL ⚠️: This tool hangs up the phone call. You MUST use it when: 1) The caller asks to end the call using ANY ending phrases like 'end the call', 'hang up', 'goodbye', 'that's all', etc., or 2) The conversation naturally concludes. Using this tool is REQUIRED for proper call termination - simply saying goodbye is NOT enough.",
+        "get_address": "Returns the restaurant's address. Use this tool whenever a caller asks for the restaurant's location, address, or where the restaurant is located.",
+        "forward_call": "⚠️ CRITICAL TOOL ⚠️: Forwards the call to the restaurant owner. Use this tool when a caller needs to speak directly with the restaurant owner or manager. You MUST: 1) announce that you'll be transferring them to the restaurant owner, 2) actually USE this TOOL, not just say you're transferring the call. Just saying 'I'll transfer you' without using this tool will NOT forward the call - you must use the actual forward_call tool.",
     }
+}
+
+_DYNAMIC_PROMPT_SECTIONS: Dict[str, Any] = {
+    "workplace": {
+        "restaurantName": "{restaurant_name}",
+        "restaurantType": "Casual Dining",
+        "location": "{location}"
+    },
+    "operationalContext": {
+        "timeZone": "CST",
+        "workingHours": "{working_hours}",
+        "peakHours": "6 PM - 9 PM"
+    }
+}
+
+_STATIC_PROMPT_JSON = orjson.dumps(_STATIC_PROMPT_SECTIONS).decode()
+
+# Marks where the shared prefix ends and the restaurant-specific sections begin
+SYSTEM_PROMPT_DYNAMIC_BOUNDARY = "\n<SYSTEM_PROMPT_DYNAMIC_BOUNDARY>\n"
+
+_FIRST_MESSAGE_TEMPLATE = "Good {time_of_day}! This is Pulsara from {restaurant_name}. How may I assist you today?"
+
+def get_system_prompt_template() -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Get the system prompt template.
+    
+    The returned dictionaries are shared, so callers must not mutate them in place.
+    
+    Returns:
+        A tuple of (static sections, dynamic sections with placeholders)
+    """
+    return _STATIC_PROMPT_SECTIONS, _DYNAMIC_PROMPT_SECTIONS
 
 def get_first_message_template() -> str:
     """
@@ -86,7 +149,29 @@ def get_first_message_template() -> str:
     Returns:
         The first message template as a string
     """
-    return "Good {time_of_day}! This is Pulsara from {restaurant_name}. How may I assist you today?"
+    return _FIRST_MESSAGE_TEMPLATE
+
+def serialize_system_prompt(system_prompt: Dict[str, Any]) -> str:
+    """
+    Serialize a system prompt to text, keeping the static sections as a cacheable prefix.
+    
+    Prompts built from the template are sent as the pre-serialized static sections, the
+    boundary marker, then the remaining sections. Custom prompts are serialized as-is.
+    
+    Args:
+        system_prompt: The system prompt dictionary
+        
+    Returns:
+        The system prompt as a string
+    """
+    # Agent validation copies the dict, so compare by value; the nested strings are
+    # shared with the template, which keeps the comparison much cheaper than serializing
+    static = {key: system_prompt[key] for key in _STATIC_PROMPT_SECTIONS if key in system_prompt}
+    if static != _STATIC_PROMPT_SECTIONS:
+        return orjson.dumps(system_prompt).decode()
+    
+    dynamic = {key: value for key, value in system_prompt.items() if key not in _STATIC_PROMPT_SECTIONS}
+    return _STATIC_PROMPT_JSON + SYSTEM_PROMPT_DYNAMIC_BOUNDARY + orjson.dumps(dynamic).decode()
 
 async def create_agent_async(agent: Agent) -> str:
     """
@@ -106,7 +191,7 @@ async def create_agent_async(agent: Agent) -> str:
             "conversation_config": {
                 "agent": {
                     "prompt": {
-                        "prompt": json.dumps(agent.system_prompt),
+                        "prompt": serialize_system_prompt(agent.system_prompt),
                         "tools": agent.tools
                     },
                     "first_message": agent.first_message,
@@ -126,7 +211,7 @@ async def create_agent_async(agent: Agent) -> str:
         # Extract and return the agent ID
         agent_id = response.get("agent_id")
         if not agent_id:
-            logger.error(f"Failed to create agent: {json.dumps(response)}")
+            logger.error(f"Failed to create agent: {orjson.dumps(response).decode()}")
             return ELEVENLABS_AGENT_ID or "mock_elevenlabs_agent_id"
         
         return agent_id
@@ -136,25 +221,108 @@ async def create_agent_async(agent: Agent) -> str:
         # Fall back to the default agent ID
         return ELEVENLABS_AGENT_ID or "mock_elevenlabs_agent_id"
 
-def create_agent(agent: Agent) -> str:
+class _BatchedUpdater:
     """
-    Create an agent in ElevenLabs.
+    Collects agent updates over a short window and sends them together.
     
-    Args:
-        agent: The agent to create
-        
-    Returns:
-        The ElevenLabs agent ID
+    Bulk operations (such as updating prompts across many restaurants) submit updates in a
+    tight loop; a single background task drains them in batches, fans the PATCHes for
+    different agents out with asyncio.gather, and resolves each caller's future. Updates to
+    the same agent within a window are sent one after another in submission order, so every
+    caller gets the result of its own configuration.
     """
-    # Run the async function in a new event loop
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        # If there's no event loop in the current thread, create a new one
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
     
-    return loop.run_until_complete(create_agent_async(agent))
+    WINDOW = 0.02
+    MAX_BATCH = 32
+    
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    async def submit(self, agent_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue an agent update and wait for its result.
+        
+        Args:
+            agent_id: The ElevenLabs agent ID
+            config: The agent configuration
+            
+        Returns:
+            The API response for the update
+        """
+        # Resolve the client here so a configuration error reaches the caller
+        # instead of the background task
+        client = get_api_client()
+        
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or the previous event loop has gone away
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = None
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        
+        future = loop.create_future()
+        await self._queue.put((client, agent_id, config, future))
+        return await future
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                # Wait briefly for more updates to accumulate
+                deadline = loop.time() + self.WINDOW
+                while len(batch) < self.MAX_BATCH:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                    except asyncio.TimeoutError:
+                        break
+                
+                # Group updates per agent, keeping submission order
+                per_agent: Dict[str, List[Tuple[ElevenLabsAPIClient, Dict[str, Any], asyncio.Future]]] = {}
+                for client, agent_id, config, future in batch:
+                    per_agent.setdefault(agent_id, []).append((client, config, future))
+                
+                await asyncio.gather(
+                    *(self._send_in_order(agent_id, updates) for agent_id, updates in per_agent.items())
+                )
+            except Exception as e:
+                logger.error(f"Error sending batched agent updates: {str(e)}")
+                for _, _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    @staticmethod
+    async def _send_in_order(
+        agent_id: str,
+        updates: List[Tuple[ElevenLabsAPIClient, Dict[str, Any], asyncio.Future]]
+    ) -> None:
+        """
+        Send one agent's queued updates one after another and resolve each caller's future.
+        
+        Args:
+            agent_id: The ElevenLabs agent ID
+            updates: (client, config, future) tuples in submission order
+        """
+        for client, config, future in updates:
+            if future.done():
+                continue
+            try:
+                result = await client.update_agent(agent_id, config)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+_agent_updater = _BatchedUpdater()
 
 async def update_agent_async(agent: Agent) -> bool:
     """
@@ -174,7 +342,7 @@ async def update_agent_async(agent: Agent) -> bool:
             "conversation_config": {
                 "agent": {
                     "prompt": {
-                        "prompt": json.dumps(agent.system_prompt),
+                        "prompt": serialize_system_prompt(agent.system_prompt),
                         "tools": agent.tools
                     },
                     "first_message": agent.first_message,
@@ -187,9 +355,8 @@ async def update_agent_async(agent: Agent) -> bool:
             "name": agent.name
         }
         
-        # Make the API call
-        client = get_api_client()
-        response = await client.update_agent(agent.elevenlabs_agent_id, config)
+        # Make the API call (batched with any other updates in flight)
+        response = await _agent_updater.submit(agent.elevenlabs_agent_id, config)
         
         # Check if the update was successful
         return "agent_id" in response
@@ -198,26 +365,6 @@ async def update_agent_async(agent: Agent) -> bool:
         logger.error(f"Error updating agent: {str(e)}")
         return False
 
-def update_agent(agent: Agent) -> bool:
-    """
-    Update an agent in ElevenLabs.
-    
-    Args:
-        agent: The agent to update
-        
-    Returns:
-        True if the agent was updated successfully, False otherwise
-    """
-    # Run the async function in a new event loop
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        # If there's no event loop in the current thread, create a new one
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    
-    return loop.run_until_complete(update_agent_async(agent))
-
 def delete_agent(elevenlabs_agent_id: str) -> bool:
     """
     Delete an agent from ElevenLabs.
@@ -248,9 +395,11 @@ async def sync_knowledge_base_async(kb: KnowledgeBase) -> bool:
     try:
         # Make the API call to create or update the knowledge base
         client = get_api_client()
+        # Encode off the event loop (large documents) and hand httpx a file object to stream
+        file_content = io.BytesIO(await asyncio.to_thread(str.encode, kb.content, 'utf-8'))
         response = await client.create_knowledge_base_document(
             name=kb.name,
-            file_content=kb.content.encode('utf-8'),
+            file_content=file_content,
             file_name=f"{kb.name}.txt"
         )
         
@@ -260,33 +409,13 @@ async def sync_knowledge_base_async(kb: KnowledgeBase) -> bool:
             kb.elevenlabs_kb_id = response["id"]
             return True
         else:
-            logger.error(f"Failed to sync knowledge base: {json.dumps(response)}")
+            logger.error(f"Failed to sync knowledge base: {orjson.dumps(response).decode()}")
             return False
     
     except Exception as e:
         logger.error(f"Error syncing knowledge base: {str(e)}")
         return False
 
-def sync_knowledge_base(kb: KnowledgeBase) -> bool:
-    """
-    Sync a knowledge base with ElevenLabs.
-    
-    Args:
-        kb: The knowledge base to sync
-        
-    Returns:
-        True if the knowledge base was synced successfully, False otherwise
-    """
-    # Run the async function in a new event loop
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        # If there's no event loop in the current thread, create a new one
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    
-    return loop.run_until_complete(sync_knowledge_base_async(kb))
-
 async def delete_knowledge_base_async(elevenlabs_kb_id: str) -> bool:
     """
     Delete a knowledge base from ElevenLabs asynchronously.
@@ -311,25 +440,56 @@ async def delete_knowledge_base_async(elevenlabs_kb_id: str) -> bool:
         logger.error(f"Error deleting knowledge base: {str(e)}")
         return False
 
-def delete_knowledge_base(elevenlabs_kb_id: str) -> bool:
+async def _sync_knowledge_base_bounded(kb: KnowledgeBase) -> bool:
+    async with _get_kb_semaphore():
+        return await sync_knowledge_base_async(kb)
+
+async def _delete_knowledge_base_bounded(elevenlabs_kb_id: str) -> bool:
+    async with _get_kb_semaphore():
+        return await delete_knowledge_base_async(elevenlabs_kb_id)
+
+async def sync_knowledge_bases_async(kbs: List[KnowledgeBase]) -> List[bool]:
     """
-    Delete a knowledge base from ElevenLabs.
+    Sync several knowledge bases with ElevenLabs concurrently.
+    
+    Each document is uploaded independently, with at most KB_MAX_CONCURRENCY uploads in flight.
     
     Args:
-        elevenlabs_kb_id: The ElevenLabs knowledge base ID
+        kbs: The knowledge bases to sync
         
     Returns:
-        True if the knowledge base was deleted successfully, False otherwise
+        A list of success flags, in the same order as kbs
     """
-    # Run the async function in a new event loop
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        # If there's no event loop in the current thread, create a new one
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    results = await asyncio.gather(
+        *(_sync_knowledge_base_bounded(kb) for kb in kbs),
+        return_exceptions=True
+    )
+    return [result is True for result in results]
+
+async def delete_knowledge_bases_async(elevenlabs_kb_ids: List[str]) -> List[bool]:
+    """
+    Delete several knowledge bases from ElevenLabs concurrently.
     
-    return loop.run_until_complete(delete_knowledge_base_async(elevenlabs_kb_id))
+    Args:
+        elevenlabs_kb_ids: The ElevenLabs knowledge base IDs
+        
+    Returns:
+        A list of success flags, in the same order as elevenlabs_kb_ids
+    """
+    results = await asyncio.gather(
+        *(_delete_knowledge_base_bounded(kb_id) for kb_id in elevenlabs_kb_ids),
+        return_exceptions=True
+    )
+    return [result is True for result in results]
+
+# Mock responses for test_agent_async, keyed by the keyword that triggers them
+_TEST_KEYWORD_PATTERN = re.compile(r"hours|menu|address", re.IGNORECASE)
+_TEST_RESPONSES = {
+    "hours": "Our hours today are 9 AM to 10 PM. Is there anything else I can help you with?",
+    "menu": "We have a variety of dishes including pasta, pizza, and salads. Our most popular dish is the Chicken Parmesan. Would you like to hear more about our menu?",
+    "address": "We are located at 1509 W Taylor St, Chicago, IL 60607. Is there anything else I can help you with?"
+}
+_TEST_DEFAULT_RESPONSE = "Thank you for your question. How else can I assist you today?"
 
 async def test_agent_async(agent: Agent, input_text: str) -> Dict[str, Any]:
     """
@@ -347,42 +507,15 @@ async def test_agent_async(agent: Agent, input_text: str) -> Dict[str, Any]:
     # For now, we'll just return a mock response
     # In a real implementation, this would make an API call to ElevenLabs
     
-    # Generate a mock response based on the input
-    if "hours" in input_text.lower():
-        response = "Our hours today are 9 AM to 10 PM. Is there anything else I can help you with?"
-    elif "menu" in input_text.lower():
-        response = "We have a variety of dishes including pasta, pizza, and salads. Our most popular dish is the Chicken Parmesan. Would you like to hear more about our menu?"
-    elif "address" in input_text.lower():
-        response = "We are located at 1509 W Taylor St, Chicago, IL 60607. Is there anything else I can help you with?"
-    else:
-        response = "Thank you for your question. How else can I assist you today?"
+    # Generate a mock response based on the first keyword in the input
+    match = _TEST_KEYWORD_PATTERN.search(input_text)
+    response = _TEST_RESPONSES[match.group(0).lower()] if match else _TEST_DEFAULT_RESPONSE
     
     return {
         "response": response,
         "audio_url": "https://storage.pulsara.ai/test-responses/response_123.mp3"
     }
 
-def test_agent(agent: Agent, input_text: str) -> Dict[str, Any]:
-    """
-    Test an agent with a sample input.
-    
-    Args:
-        agent: The agent to test
-        input_text: The input text to test with
-        
-    Returns:
-        A dictionary containing the agent's response
-    """
-    # Run the async function in a new event loop
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        # If there's no event loop in the current thread, create a new one
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    
-    return loop.run_until_complete(test_agent_async(agent, input_text))
-
 def create_conversation(
     agent_id: str,
     audio_interface: Any,
@@ -405,16 +538,15 @@ def create_conversation(
     Returns:
         A conversation object
     """
-    # Create a new conversation
-    conversation = ElevenLabsConversation(
-        agent_id=agent_id,
-        audio_interface=audio_interface,
+    # Reuse the agent's factory so only per-call state is set up here
+    factory = _conversation_factories.get(agent_id)
+    if factory is None:
+        factory = _conversation_factories[agent_id] = ConversationFactory(agent_id)
+    
+    return factory.spawn(
+        audio_interface,
+        on_tool_use=on_tool_use,
+        on_agent_response=on_agent_response,
+        on_user_transcript=on_user_transcript,
         config=config
     )
-    
-    # Set up callbacks
-    conversation.on_tool_use = on_tool_use
-    conversation.on_agent_response = on_agent_response
-    conversation.on_user_transcript = on_user_transcript
-    
-    return conversation
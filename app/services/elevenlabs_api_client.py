@@ -2,16 +2,98 @@
 ElevenLabs API client for direct API calls without using the SDK.
 """
 
-import json
+import orjson
 import asyncio
+import time
 import websockets
 import httpx
-from typing import Dict, Any, Optional, List, Callable, Union
+from cachetools import TTLCache
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+from typing import Dict, Any, Optional, List, Callable, Union, BinaryIO
 from app.utils.logging import get_logger
 from config.environment import ELEVENLABS_API_KEY
 
 logger = get_logger(__name__)
 
+# Status codes that indicate a transient ElevenLabs problem worth retrying
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# Methods that are safe to resend after a network error or gateway failure
+IDEMPOTENT_METHODS = frozenset({"GET", "PATCH", "DELETE"})
+
+class CircuitOpenError(Exception):
+    """Raised when ElevenLabs requests are short-circuited after repeated failures."""
+
+class CircuitBreaker:
+    """
+    Minimal circuit breaker for the ElevenLabs API.
+    
+    After fail_max consecutive failures the circuit opens and requests fail fast for
+    reset_timeout seconds. The next request after that is let through as a single trial
+    while concurrent requests keep failing fast: success closes the circuit, failure opens
+    it again. A trial that never reports back stops blocking others after reset_timeout.
+    """
+    
+    def __init__(self, fail_max: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the circuit breaker.
+        
+        Args:
+            fail_max: Consecutive failures before the circuit opens
+            reset_timeout: Seconds to fail fast before allowing a trial request
+        """
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_started_at: Optional[float] = None
+    
+    def before_call(self) -> None:
+        """
+        Check that a request may be made.
+        
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if self.opened_at is None:
+            return
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_timeout:
+            raise CircuitOpenError("ElevenLabs circuit is open, failing fast")
+        if self.trial_started_at is not None and now - self.trial_started_at < self.reset_timeout:
+            raise CircuitOpenError("ElevenLabs circuit is half-open, trial request in flight")
+        # Half-open: this request is the trial
+        self.trial_started_at = now
+    
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+    
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit once fail_max is reached."""
+        self.failures += 1
+        self.trial_started_at = None
+        if self.failures >= self.fail_max:
+            if self.opened_at is None:
+                logger.warning(f"ElevenLabs circuit opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
+def _is_transient_error(exc: BaseException) -> bool:
+    """
+    Check whether an exception indicates ElevenLabs is unavailable rather than a bad request.
+    
+    Args:
+        exc: The exception raised by a request
+        
+    Returns:
+        True for network errors and retryable status codes
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, httpx.TransportError)
+
 class ElevenLabsAPIClient:
     """
     Client for making direct API calls to ElevenLabs API.
@@ -23,7 +105,25 @@ class ElevenLabsAPIClient:
     BASE_URL = "https://api.elevenlabs.io"
     API_VERSION = "v1"
     
-    def __init__(self, api_key: str = None):
+    # Endpoint URLs, built once rather than formatted on every request
+    _API_ROOT = f"{BASE_URL}/{API_VERSION}/"
+    _URL_CREATE_AGENT = _API_ROOT + "convai/agents/create"
+    _URL_KNOWLEDGE_BASE = _API_ROOT + "convai/knowledge-base"
+    _URL_CONVERSATIONS = _API_ROOT + "convai/conversations"
+    _AGENT_URL_PREFIX = _API_ROOT + "convai/agents/"
+    _KNOWLEDGE_BASE_URL_PREFIX = _URL_KNOWLEDGE_BASE + "/"
+    _CONVERSATION_URL_PREFIX = _URL_CONVERSATIONS + "/"
+    
+    # Agent and knowledge base reads tolerate a few seconds of staleness
+    GET_CACHE_MAXSIZE = 1024
+    GET_CACHE_TTL = 15
+    
+    # Retry transient failures with jittered exponential backoff
+    RETRY_ATTEMPTS = 3
+    RETRY_WAIT_INITIAL = 0.2
+    RETRY_WAIT_MAX = 2.0
+    
+    def __init__(self, api_key: Optional[str] = None):
         """
         Initialize the ElevenLabs API client.
         
@@ -35,18 +135,39 @@ class ElevenLabsAPIClient:
             logger.error("No ElevenLabs API key provided")
             raise ValueError("ElevenLabs API key is required")
         
-        self.headers = {
+        # Request headers, built once and shared by every request (never mutated).
+        # Multipart uploads omit Content-Type so httpx can set the boundary.
+        self._multipart_headers = {"xi-api-key": self.api_key}
+        self._json_headers = {
             "xi-api-key": self.api_key,
             "Content-Type": "application/json"
         }
+        self.headers = self._json_headers
         
-        # Initialize HTTP client with timeout and retry settings
+        # Initialize HTTP client with timeout and connection pool settings.
+        # HTTP/2 lets concurrent calls share one TLS connection, and the keepalive
+        # pool keeps it warm between bursts of agent/KB operations.
         self.client = httpx.AsyncClient(
-            timeout=30.0,  # 30 second timeout
-            headers=self.headers
+            http2=True,
+            timeout=httpx.Timeout(30.0, connect=5.0),  # 30 second timeout, fail fast on connect
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=64,
+                keepalive_expiry=60.0
+            ),
+            headers=self._multipart_headers
         )
+        
+        # In-flight GETs keyed by (url, params), so concurrent identical reads share one request
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        
+        # Short-lived cache of GET responses, keyed by (url, params)
+        self._cache: TTLCache = TTLCache(maxsize=self.GET_CACHE_MAXSIZE, ttl=self.GET_CACHE_TTL)
+        
+        # Fail fast instead of waiting on timeouts while ElevenLabs is down
+        self.circuit_breaker = CircuitBreaker(fail_max=5, reset_timeout=30.0)
     
-    async def close(self):
+    async def close(self) -> None:
         """Close the HTTP client."""
         await self.client.aclose()
     
@@ -60,15 +181,15 @@ class ElevenLabsAPIClient:
         Returns:
             The full URL
         """
-        return f"{self.BASE_URL}/{self.API_VERSION}/{endpoint}"
+        return self._API_ROOT + endpoint
     
     async def _make_request(
         self, 
         method: str, 
         endpoint: str, 
-        data: Dict[str, Any] = None,
-        params: Dict[str, Any] = None,
-        files: Dict[str, Any] = None
+        data: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        files: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Make an HTTP request to the ElevenLabs API.
@@ -86,18 +207,143 @@ class ElevenLabsAPIClient:
         Raises:
             httpx.HTTPStatusError: If the request fails
         """
-        url = self._build_url(endpoint)
+        return await self._make_request_url(method, self._build_url(endpoint), data=data, params=params, files=files)
+    
+    async def _make_request_url(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        files: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Make an HTTP request to a full, prebuilt ElevenLabs API URL.
+        
+        Args:
+            method: The HTTP method (GET, POST, PATCH, DELETE)
+            url: The full request URL
+            data: The request data (optional)
+            params: The query parameters (optional)
+            files: The files to upload (optional)
+            
+        Returns:
+            The API response as a dictionary
+            
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+        """
+        if method != "GET":
+            return await self._send_with_retry(method, url, data=data, params=params, files=files)
+        
+        # Coalesce concurrent identical GETs: the first caller issues the request and
+        # later callers await the same task. Callers share the returned dictionary.
+        key = (url, tuple(sorted((params or {}).items())))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._send_with_retry(method, url, params=params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # Shield so one cancelled caller does not cancel the request for the others
+        return await asyncio.shield(task)
+    
+    async def _send_with_retry(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        files: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a request through the circuit breaker, retrying transient failures.
         
-        # Log the request (but mask sensitive data)
-        safe_data = "**REDACTED**" if data else None
-        logger.info(f"Making {method} request to {url} with params={params}")
+        Rate limiting (429) is retried for every method, since the request was not
+        processed. Network errors and gateway failures are only retried for idempotent
+        methods, so an agent or document is never created twice.
+        
+        Args:
+            method: The HTTP method (GET, POST, PATCH, DELETE)
+            url: The full request URL
+            data: The request data (optional)
+            params: The query parameters (optional)
+            files: The files to upload (optional)
+            
+        Returns:
+            The API response as a dictionary
+            
+        Raises:
+            CircuitOpenError: If the circuit is open
+            httpx.HTTPStatusError: If the request fails
+        """
+        self.circuit_breaker.before_call()
+        
+        def should_retry(exc: BaseException) -> bool:
+            if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429:
+                return True
+            return method in IDEMPOTENT_METHODS and _is_transient_error(exc)
+        
+        try:
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(self.RETRY_ATTEMPTS),
+                wait=wait_exponential_jitter(initial=self.RETRY_WAIT_INITIAL, max=self.RETRY_WAIT_MAX),
+                retry=retry_if_exception(should_retry),
+                reraise=True
+            ):
+                with attempt:
+                    if attempt.retry_state.attempt_number > 1:
+                        logger.warning("Retrying %s %s (attempt %d)", method, url, attempt.retry_state.attempt_number)
+                        # Rewind file objects consumed by the previous attempt
+                        for file_value in (files or {}).values():
+                            file_obj = file_value[1] if isinstance(file_value, tuple) else file_value
+                            if hasattr(file_obj, "seek"):
+                                file_obj.seek(0)
+                    response = await self._send_request(method, url, data=data, params=params, files=files)
+        except Exception as e:
+            if _is_transient_error(e):
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            raise
+        
+        self.circuit_breaker.record_success()
+        return response
+    
+    async def _send_request(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        files: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Send an HTTP request to a full ElevenLabs API URL.
+        
+        Args:
+            method: The HTTP method (GET, POST, PATCH, DELETE)
+            url: The full request URL
+            data: The request data (optional)
+            params: The query parameters (optional)
+            files: The files to upload (optional)
+            
+        Returns:
+            The API response as a dictionary
+            
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+        """
+        # Log the request (never the body, which may hold sensitive data). %-style
+        # arguments defer the formatting until a handler actually emits the record.
+        logger.info("Making %s request to %s with params=%s", method, url, params)
         
         try:
-            # Prepare headers based on whether we're sending files
-            request_headers = self.headers.copy()
-            if files:
-                # Remove Content-Type for multipart/form-data (will be set automatically)
-                request_headers.pop("Content-Type", None)
+            # Pick the prebuilt headers based on whether we're sending files
+            request_headers = self._multipart_headers if files else self._json_headers
+            
+            # Encode JSON bodies with orjson (httpx's json= uses the stdlib encoder)
+            content = orjson.dumps(data) if data is not None and not files else None
             
             # Make the request
             if method == "GET":
@@ -106,9 +352,9 @@ class ElevenLabsAPIClient:
                 if files:
                     response = await self.client.post(url, data=data, files=files, params=params, headers=request_headers)
                 else:
-                    response = await self.client.post(url, json=data, params=params, headers=request_headers)
+                    response = await self.client.post(url, content=content, params=params, headers=request_headers)
             elif method == "PATCH":
-                response = await self.client.patch(url, json=data, params=params, headers=request_headers)
+                response = await self.client.patch(url, content=content, params=params, headers=request_headers)
             elif method == "DELETE":
                 response = await self.client.delete(url, params=params, headers=request_headers)
             else:
@@ -118,27 +364,58 @@ class ElevenLabsAPIClient:
             response.raise_for_status()
             
             # Parse and return the response
-            if response.headers.get("content-type") == "application/json":
-                return response.json()
+            # Match on the media type prefix so "application/json; charset=utf-8" is parsed too
+            if response.headers.get("content-type", "").startswith("application/json"):
+                return orjson.loads(response.content)
             else:
                 return {"status": "success", "status_code": response.status_code}
                 
         except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error: {e.response.status_code} - {e.response.text}")
+            logger.error("HTTP error: %s - %s", e.response.status_code, e.response.text)
             # Try to parse error response as JSON
             try:
-                error_data = e.response.json()
-                logger.error(f"Error details: {json.dumps(error_data)}")
+                error_data = orjson.loads(e.response.content)
+                logger.error("Error details: %s", orjson.dumps(error_data).decode())
             except:
-                logger.error(f"Raw error response: {e.response.text}")
+                logger.error("Raw error response: %s", e.response.text)
             raise
         except httpx.RequestError as e:
-            logger.error(f"Request error: {str(e)}")
+            logger.error("Request error: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error: {str(e)}")
+            logger.error("Unexpected error: %s", e)
             raise
     
+    async def _cached_get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Make a GET request, serving repeat reads from the TTL cache.
+        
+        Args:
+            url: The full request URL
+            params: The query parameters (optional)
+            
+        Returns:
+            The API response as a dictionary (shared with other callers, do not mutate)
+        """
+        key = (url, tuple(sorted((params or {}).items())))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        
+        response = await self._make_request_url("GET", url, params=params)
+        self._cache[key] = response
+        return response
+    
+    def _invalidate(self, *urls: str) -> None:
+        """
+        Drop cached GET responses for the given URLs.
+        
+        Args:
+            urls: The full URLs whose cached reads are now stale
+        """
+        for url in urls:
+            self._cache.pop((url, ()), None)
+    
     # Agent Management API
     
     async def create_agent(self, config: Dict[str, Any]) -> Dict[str, Any]:
@@ -151,7 +428,7 @@ class ElevenLabsAPIClient:
         Returns:
             The created agent data
         """
-        return await self._make_request("POST", "convai/agents/create", data=config)
+        return await self._make_request_url("POST", self._URL_CREATE_AGENT, data=config)
     
     async def get_agent(self, agent_id: str) -> Dict[str, Any]:
         """
@@ -163,7 +440,7 @@ class ElevenLabsAPIClient:
         Returns:
             The agent data
         """
-        return await self._make_request("GET", f"convai/agents/{agent_id}")
+        return await self._cached_get(self._AGENT_URL_PREFIX + agent_id)
     
     async def update_agent(self, agent_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -176,7 +453,10 @@ class ElevenLabsAPIClient:
         Returns:
             The updated agent data
         """
-        return await self._make_request("PATCH", f"convai/agents/{agent_id}", data=config)
+        url = self._AGENT_URL_PREFIX + agent_id
+        response = await self._make_request_url("PATCH", url, data=config)
+        self._invalidate(url)
+        return response
     
     # Knowledge Base API
     
@@ -187,7 +467,7 @@ class ElevenLabsAPIClient:
         Returns:
             The knowledge base documents
         """
-        return await self._make_request("GET", "convai/knowledge-base")
+        return await self._cached_get(self._URL_KNOWLEDGE_BASE)
     
     async def get_knowledge_base_document(self, document_id: str) -> Dict[str, Any]:
         """
@@ -199,14 +479,14 @@ class ElevenLabsAPIClient:
         Returns:
             The document data
         """
-        return await self._make_request("GET", f"convai/knowledge-base/{document_id}")
+        return await self._cached_get(self._KNOWLEDGE_BASE_URL_PREFIX + document_id)
     
     async def create_knowledge_base_document(
         self, 
-        name: str = None, 
-        url: str = None, 
-        file_content: bytes = None,
-        file_name: str = None
+        name: Optional[str] = None, 
+        url: Optional[str] = None, 
+        file_content: Optional[Union[bytes, BinaryIO]] = None,
+        file_name: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Create a new knowledge base document.
@@ -214,14 +494,14 @@ class ElevenLabsAPIClient:
         Args:
             name: The document name (optional)
             url: The document URL (optional)
-            file_content: The file content (optional)
+            file_content: The file content as bytes or a binary file object to stream (optional)
             file_name: The file name (optional)
             
         Returns:
             The created document data
         """
-        data = {}
-        files = None
+        data: Dict[str, Any] = {}
+        files: Optional[Dict[str, Any]] = None
         
         if name:
             data["name"] = name
@@ -232,12 +512,14 @@ class ElevenLabsAPIClient:
         if file_content and file_name:
             files = {"file": (file_name, file_content)}
         
-        return await self._make_request(
+        response = await self._make_request_url(
             "POST", 
-            "convai/knowledge-base", 
+            self._URL_KNOWLEDGE_BASE, 
             data=data, 
             files=files
         )
+        self._invalidate(self._URL_KNOWLEDGE_BASE)
+        return response
     
     async def delete_knowledge_base_document(self, document_id: str) -> Dict[str, Any]:
         """
@@ -249,14 +531,17 @@ class ElevenLabsAPIClient:
         Returns:
             The deletion result
         """
-        return await self._make_request("DELETE", f"convai/knowledge-base/{document_id}")
+        url = self._KNOWLEDGE_BASE_URL_PREFIX + document_id
+        response = await self._make_request_url("DELETE", url)
+        self._invalidate(url, self._URL_KNOWLEDGE_BASE)
+        return response
     
     # Conversation API
     
     async def list_conversations(
         self, 
-        agent_id: str = None,
-        cursor: str = None,
+        agent_id: Optional[str] = None,
+        cursor: Optional[str] = None,
         page_size: int = 30
     ) -> Dict[str, Any]:
         """
@@ -278,7 +563,7 @@ class ElevenLabsAPIClient:
         if page_size:
             params["page_size"] = page_size
             
-        return await self._make_request("GET", "convai/conversations", params=params)
+        return await self._make_request_url("GET", self._URL_CONVERSATIONS, params=params)
     
     async def get_conversation(self, conversation_id: str) -> Dict[str, Any]:
         """
@@ -290,7 +575,7 @@ class ElevenLabsAPIClient:
         Returns:
             The conversation data
         """
-        return await self._make_request("GET", f"convai/conversations/{conversation_id}")
+        return await self._make_request_url("GET", self._CONVERSATION_URL_PREFIX + conversation_id)
     
     async def delete_conversation(self, conversation_id: str) -> Dict[str, Any]:
         """
@@ -302,7 +587,7 @@ class ElevenLabsAPIClient:
         Returns:
             The deletion result
         """
-        return await self._make_request("DELETE", f"convai/conversations/{conversation_id}")
+        return await self._make_request_url("DELETE", self._CONVERSATION_URL_PREFIX + conversation_id)
     
     async def get_conversation_audio(self, conversation_id: str) -> bytes:
         """
@@ -314,7 +599,7 @@ class ElevenLabsAPIClient:
         Returns:
             The audio data as bytes
         """
-        url = self._build_url(f"convai/conversations/{conversation_id}/audio")
+        url = self._CONVERSATION_URL_PREFIX + conversation_id + "/audio"
         
         try:
             response = await self.client.get(url)
@@ -330,9 +615,9 @@ class ElevenLabsAPIClient:
         self,
         agent_id: str,
         audio_interface: Any,
-        on_tool_use: Callable[[str, Dict[str, Any]], None] = None,
-        on_agent_response: Callable[[str], None] = None,
-        on_user_transcript: Callable[[str], None] = None
+        on_tool_use: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        on_agent_response: Optional[Callable[[str], None]] = None,
+        on_user_transcript: Optional[Callable[[str], None]] = None
     ) -> Any:
         """
         Start a conversation with an agent using WebSockets.
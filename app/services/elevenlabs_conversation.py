@@ -2,20 +2,64 @@
 ElevenLabs conversation handler for WebSocket communication.
 """
 
-import json
+import orjson
 import asyncio
+import logging
 import base64
 import uuid
 import time
+from urllib.parse import urlencode
 from typing import Dict, Any, Optional, List, Callable, Union
-import websockets
-from websockets.exceptions import ConnectionClosed
+from picows import ws_connect, WSCloseCode, WSFrame, WSListener, WSMsgType, WSTransport
 
 from app.utils.logging import get_logger
 from config.environment import ELEVENLABS_API_KEY
 
 logger = get_logger(__name__)
 
+class _ConversationListener(WSListener):
+    """
+    picows listener that queues complete inbound messages for ElevenLabsConversation.
+    
+    Messages are queued as (message type, payload bytes) tuples. Text payloads are left
+    undecoded: orjson validates UTF-8 while parsing, so decoding them to str first would
+    only scan every audio frame twice. None is queued when the connection closes.
+    Pings are answered by picows itself.
+    """
+    
+    def __init__(self):
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self._fragment_type: Optional[WSMsgType] = None
+        self._fragments: List[bytes] = []
+    
+    def on_ws_frame(self, transport: WSTransport, frame: WSFrame):
+        msg_type = frame.msg_type
+        
+        if msg_type == WSMsgType.CLOSE:
+            # Complete the closing handshake
+            transport.send_close(frame.get_close_code())
+            transport.disconnect()
+            return
+        
+        # Reassemble fragmented messages (the frame payload is only valid during this call)
+        if msg_type == WSMsgType.CONTINUATION:
+            self._fragments.append(frame.get_payload_as_bytes())
+            if not frame.fin:
+                return
+            msg_type, payload = self._fragment_type, b"".join(self._fragments)
+            self._fragment_type, self._fragments = None, []
+        elif not frame.fin:
+            self._fragment_type, self._fragments = msg_type, [frame.get_payload_as_bytes()]
+            return
+        else:
+            payload = frame.get_payload_as_bytes()
+        
+        if msg_type == WSMsgType.TEXT or msg_type == WSMsgType.BINARY:
+            self.messages.put_nowait((msg_type, payload))
+    
+    def on_ws_disconnected(self, transport: WSTransport):
+        self.messages.put_nowait(None)
+
 class ElevenLabsConversation:
     """
     Handler for WebSocket-based conversations with ElevenLabs.
@@ -26,12 +70,43 @@ class ElevenLabsConversation:
     
     WEBSOCKET_URL = "wss://api.elevenlabs.io/v1/convai/stream"
     
+    # Outbound audio frame envelope; base64 needs no JSON escaping, so the payload is
+    # spliced between these instead of building and serializing a dict per frame
+    _AUDIO_FRAME_PREFIX = b'{"type":"audio","data":"'
+    _AUDIO_FRAME_SUFFIX = b'"}'
+    
+    # Space picows needs in front of a reused buffer to write the frame header
+    _FRAME_HEADER_ROOM = 14
+    
+    # Max audio chunks waiting to be sent (~1.3s at 20ms per chunk); newer chunks are
+    # dropped beyond this rather than letting latency grow without bound
+    SEND_QUEUE_SIZE = 64
+    
+    # Up to this many queued input chunks are coalesced into one frame, waiting at most
+    # SEND_BATCH_DELAY seconds after the first for the rest to arrive
+    SEND_BATCH_FRAMES = 4
+    SEND_BATCH_DELAY = 0.005
+    
+    # Frames and audio payloads larger than this (in bytes) are decoded in a worker
+    # thread so one big message does not stall the event loop
+    OFFLOAD_THRESHOLD = 16384
+    
+    # WebSocket options for audio (picows never negotiates compression, which base64
+    # audio would not benefit from anyway)
+    CONNECT_OPTIONS = {
+        "max_frame_size": 2 ** 20,
+        "enable_auto_ping": True,
+        "auto_ping_idle_timeout": 20,
+        "auto_ping_reply_timeout": 20
+    }
+    
     def __init__(
         self,
         agent_id: str,
         api_key: str = None,
         audio_interface: Any = None,
-        config: Dict[str, Any] = None
+        config: Dict[str, Any] = None,
+        session_url: Optional[str] = None
     ):
         """
         Initialize the ElevenLabs conversation handler.
@@ -41,17 +116,25 @@ class ElevenLabsConversation:
             api_key: The ElevenLabs API key (defaults to environment variable)
             audio_interface: The audio interface for sending/receiving audio
             config: Additional configuration for the conversation
+            session_url: Prebuilt WebSocket URL for this agent (optional, see ConversationFactory)
         """
         self.agent_id = agent_id
         self.api_key = api_key or ELEVENLABS_API_KEY
         self.audio_interface = audio_interface
         self.config = config or {}
+        self.session_url = session_url or self.build_session_url(self.api_key, agent_id)
+        
+        # Full connection URL for this call, built once
+        self._url = self.session_url
+        if "conversation_id" in self.config:
+            self._url += "&" + urlencode({"conversation_id": self.config["conversation_id"]})
         
         # Generate a unique conversation ID
         self.conversation_id = str(uuid.uuid4())
         
-        # WebSocket connection
-        self.websocket = None
+        # WebSocket connection (picows transport) and the listener receiving its messages
+        self.websocket: Optional[WSTransport] = None
+        self._listener: Optional[_ConversationListener] = None
         self.is_connected = False
         self.is_session_active = False
         
@@ -63,11 +146,41 @@ class ElevenLabsConversation:
         # Task for receiving messages
         self.receive_task = None
         
+        # Queue and task for sending input audio, created when the session starts
+        self._send_queue: Optional[asyncio.Queue] = None
+        self._sender_task = None
+        
         # Audio buffer for incoming audio from the agent
         self.audio_buffer = bytearray()
         
+        # Scratch buffer reused for every outbound audio frame
+        self._frame_buffer = bytearray(self._FRAME_HEADER_ROOM)
+        
+        # Handlers for inbound messages, keyed by message type
+        self._handlers: Dict[str, Callable[[Any], None]] = {
+            "agent_response": self._on_agent_response_message,
+            "audio": self._on_audio_message,
+            "user_transcript": self._on_user_transcript_message,
+            "client_tool_call": self._on_tool_call_message,
+            "error": self._on_error_message
+        }
+        
         logger.info(f"Initialized conversation handler for agent {agent_id}")
     
+    @classmethod
+    def build_session_url(cls, api_key: str, agent_id: str) -> str:
+        """
+        Build the WebSocket URL for a conversation with the given agent.
+        
+        Args:
+            api_key: The ElevenLabs API key
+            agent_id: The ElevenLabs agent ID
+            
+        Returns:
+            The WebSocket URL with authentication and agent query parameters
+        """
+        return cls.WEBSOCKET_URL + "?" + urlencode({"xi-api-key": api_key, "agent_id": agent_id})
+    
     async def start_session(self):
         """
         Start a conversation session with the agent.
@@ -79,29 +192,21 @@ class ElevenLabsConversation:
             return
         
         try:
-            # Prepare connection parameters
-            params = {
-                "xi-api-key": self.api_key,
-                "agent_id": self.agent_id
-            }
-            
-            # Add any additional parameters from config
-            if "conversation_id" in self.config:
-                params["conversation_id"] = self.config["conversation_id"]
-            
-            # Build the URL with query parameters
-            query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-            url = f"{self.WEBSOCKET_URL}?{query_string}"
-            
             logger.info(f"Connecting to WebSocket at {self.WEBSOCKET_URL} for agent {self.agent_id}")
             
-            # Connect to the WebSocket
-            self.websocket = await websockets.connect(url)
+            # Connect to the WebSocket using the prebuilt URL
+            self.websocket, self._listener = await ws_connect(
+                _ConversationListener, self._url, **self.CONNECT_OPTIONS
+            )
             self.is_connected = True
             
             # Start the message receiving task
             self.receive_task = asyncio.create_task(self._receive_messages())
             
+            # Start the audio sending task
+            self._send_queue = asyncio.Queue(maxsize=self.SEND_QUEUE_SIZE)
+            self._sender_task = asyncio.create_task(self._sender_loop())
+            
             # Mark the session as active
             self.is_session_active = True
             
@@ -128,18 +233,21 @@ class ElevenLabsConversation:
         # Mark the session as inactive
         self.is_session_active = False
         
-        # Cancel the receive task if it's running
-        if self.receive_task and not self.receive_task.done():
-            self.receive_task.cancel()
-            try:
-                await self.receive_task
-            except asyncio.CancelledError:
-                pass
+        # Cancel the receive and send tasks if they're running
+        for task in (self.receive_task, self._sender_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
         
         # Close the WebSocket connection
         if self.websocket and self.is_connected:
             try:
-                await self.websocket.close()
+                self.websocket.send_close(WSCloseCode.OK)
+                self.websocket.disconnect()
+                await self.websocket.wait_disconnected()
             except Exception as e:
                 logger.error(f"Error closing WebSocket: {str(e)}")
             finally:
@@ -180,8 +288,45 @@ class ElevenLabsConversation:
         if not self.is_session_active or not self.is_connected:
             return
         
-        # Send the audio data to the agent
-        asyncio.create_task(self._send_audio(audio_data))
+        # Queue the audio for the sender task, dropping it if the socket has fallen behind
+        try:
+            self._send_queue.put_nowait(audio_data)
+        except asyncio.QueueFull:
+            logger.warning("Audio send queue full, dropping input audio chunk")
+    
+    async def _sender_loop(self):
+        """
+        Send queued input audio to the agent in order.
+        
+        This method runs in a separate task for the lifetime of the session. Chunks that
+        arrive close together are joined and sent as one frame, so short Twilio frames do
+        not each cost a WebSocket send.
+        """
+        queue = self._send_queue
+        loop = asyncio.get_running_loop()
+        batch_frames = self.SEND_BATCH_FRAMES
+        batch_delay = self.SEND_BATCH_DELAY
+        
+        while True:
+            chunks = [await queue.get()]
+            deadline = loop.time() + batch_delay
+            
+            while len(chunks) < batch_frames:
+                try:
+                    chunks.append(queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    chunks.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            await self._send_audio(chunks[0] if len(chunks) == 1 else b"".join(chunks))
     
     async def _send_audio(self, audio_data: bytes):
         """
@@ -194,17 +339,16 @@ class ElevenLabsConversation:
             return
         
         try:
-            # Encode the audio data as base64
-            audio_base64 = base64.b64encode(audio_data).decode("utf-8")
-            
-            # Create the message
-            message = {
-                "type": "audio",
-                "data": audio_base64
-            }
+            # Assemble the JSON envelope in the scratch buffer after the header room.
+            # picows masks the payload in place, so the whole envelope is rewritten each time.
+            frame = self._frame_buffer
+            del frame[self._FRAME_HEADER_ROOM:]
+            frame += self._AUDIO_FRAME_PREFIX
+            frame += base64.b64encode(audio_data)
+            frame += self._AUDIO_FRAME_SUFFIX
             
-            # Send the message
-            await self.websocket.send(json.dumps(message))
+            # Send it as a text frame; picows writes the header into the reserved room
+            self.websocket.send_reuse_external_bytearray(WSMsgType.TEXT, frame, self._FRAME_HEADER_ROOM)
         
         except Exception as e:
             logger.error(f"Error sending audio: {str(e)}")
@@ -219,64 +363,55 @@ class ElevenLabsConversation:
             logger.error("Cannot receive messages: WebSocket not connected")
             return
         
+        # Look these up once rather than on every frame
+        handlers = self._handlers
+        audio_interface = self.audio_interface
+        offload_threshold = self.OFFLOAD_THRESHOLD
+        
+        messages = self._listener.messages
+        
         try:
-            async for message in self.websocket:
+            while True:
+                item = await messages.get()
+                if item is None:
+                    logger.info("WebSocket connection closed")
+                    break
+                msg_type, message = item
+                
                 try:
-                    # Parse the message
-                    data = json.loads(message)
-                    message_type = data.get("type")
-                    
-                    # Handle different message types
-                    if message_type == "agent_response":
-                        # Agent text response
-                        text = data.get("data", {}).get("text", "")
-                        if self.on_agent_response and text:
-                            self.on_agent_response(text)
-                    
-                    elif message_type == "audio":
-                        # Agent audio response
-                        audio_base64 = data.get("data", "")
-                        if audio_base64:
-                            # Decode the audio data
-                            audio_data = base64.b64decode(audio_base64)
-                            
-                            # Send the audio to the audio interface
-                            if self.audio_interface:
-                                self.audio_interface.output(audio_data)
-                    
-                    elif message_type == "user_transcript":
-                        # User transcript
-                        text = data.get("data", {}).get("text", "")
-                        if self.on_user_transcript and text:
-                            self.on_user_transcript(text)
+                    # Binary frames carry raw agent audio: no JSON or base64 to undo
+                    if msg_type == WSMsgType.BINARY:
+                        if audio_interface:
+                            audio_interface.output(message)
+                        continue
                     
-                    elif message_type == "client_tool_call":
-                        # Tool call from the agent
-                        tool_data = data.get("data", {})
-                        tool_name = tool_data.get("name", "")
-                        tool_params = tool_data.get("parameters", {})
-                        
-                        logger.info(f"Tool call: {tool_name} with params: {json.dumps(tool_params)}")
-                        
-                        if self.on_tool_use and tool_name:
-                            self.on_tool_use(tool_name, tool_params)
+                    # Parse the message straight from bytes (orjson validates the UTF-8)
+                    if len(message) > offload_threshold:
+                        data = await asyncio.to_thread(orjson.loads, message)
+                    else:
+                        data = orjson.loads(message)
+                    message_type = data.get("type")
+                    payload = data.get("data")
                     
-                    elif message_type == "error":
-                        # Error message
-                        error_message = data.get("data", {}).get("message", "Unknown error")
-                        logger.error(f"Error from ElevenLabs: {error_message}")
+                    # Decode large audio off the loop; awaiting it keeps frames in order
+                    if message_type == "audio" and payload and len(payload) > offload_threshold:
+                        if audio_interface:
+                            audio_interface.output(await asyncio.to_thread(base64.b64decode, payload))
+                        continue
                     
+                    # Dispatch to the handler for this message type
+                    handler = handlers.get(message_type)
+                    if handler:
+                        handler(payload)
                     else:
                         # Other message types
-                        logger.debug(f"Received message of type {message_type}: {message}")
+                        logger.debug("Received message of type %s: %s", message_type, message)
                 
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     logger.error(f"Error decoding message: {message}")
                 except Exception as e:
                     logger.error(f"Error processing message: {str(e)}")
         
-        except ConnectionClosed:
-            logger.info("WebSocket connection closed")
         except Exception as e:
             logger.error(f"Error in receive task: {str(e)}")
         finally:
@@ -287,6 +422,41 @@ class ElevenLabsConversation:
             if self.is_session_active:
                 asyncio.create_task(self.end_session())
     
+    def _on_agent_response_message(self, payload: Optional[Dict[str, Any]]):
+        """Handle an agent text response."""
+        text = (payload or {}).get("text", "")
+        if self.on_agent_response and text:
+            self.on_agent_response(text)
+    
+    def _on_audio_message(self, audio_base64: Optional[str]):
+        """Handle an agent audio response (base64 encoded)."""
+        if audio_base64 and self.audio_interface:
+            self.audio_interface.output(base64.b64decode(audio_base64))
+    
+    def _on_user_transcript_message(self, payload: Optional[Dict[str, Any]]):
+        """Handle a user transcript."""
+        text = (payload or {}).get("text", "")
+        if self.on_user_transcript and text:
+            self.on_user_transcript(text)
+    
+    def _on_tool_call_message(self, payload: Optional[Dict[str, Any]]):
+        """Handle a tool call from the agent."""
+        tool_data = payload or {}
+        tool_name = tool_data.get("name", "")
+        tool_params = tool_data.get("parameters", {})
+        
+        # Only serialize the parameters when INFO is actually logged
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Tool call: %s with params: %s", tool_name, orjson.dumps(tool_params).decode())
+        
+        if self.on_tool_use and tool_name:
+            self.on_tool_use(tool_name, tool_params)
+    
+    def _on_error_message(self, payload: Optional[Dict[str, Any]]):
+        """Handle an error message from ElevenLabs."""
+        error_message = (payload or {}).get("message", "Unknown error")
+        logger.error(f"Error from ElevenLabs: {error_message}")
+    
     async def send_interruption(self):
         """
         Send an interruption signal to the agent.
@@ -303,8 +473,65 @@ class ElevenLabsConversation:
             }
             
             # Send the message
-            await self.websocket.send(json.dumps(message))
+            self.websocket.send(WSMsgType.TEXT, orjson.dumps(message))
             logger.info("Sent interruption signal")
         
         except Exception as e:
             logger.error(f"Error sending interruption: {str(e)}")
+
+
+class ConversationFactory:
+    """
+    Per-agent factory for ElevenLabsConversation instances.
+    
+    Holds the state that is the same for every call to an agent (credentials and the
+    WebSocket URL) so that each new conversation only initializes per-call state.
+    """
+    
+    def __init__(self, agent_id: str, api_key: str = None):
+        """
+        Initialize the conversation factory.
+        
+        Args:
+            agent_id: The ElevenLabs agent ID
+            api_key: The ElevenLabs API key (defaults to environment variable)
+        """
+        self.agent_id = agent_id
+        self.api_key = api_key or ELEVENLABS_API_KEY
+        self.session_url = ElevenLabsConversation.build_session_url(self.api_key, agent_id)
+    
+    def spawn(
+        self,
+        audio_interface: Any,
+        on_tool_use: Callable[[str, Dict[str, Any]], None] = None,
+        on_agent_response: Callable[[str], None] = None,
+        on_user_transcript: Callable[[str], None] = None,
+        config: Dict[str, Any] = None
+    ) -> ElevenLabsConversation:
+        """
+        Create a conversation for a single call.
+        
+        Args:
+            audio_interface: The audio interface for sending/receiving audio
+            on_tool_use: Callback for tool usage (optional)
+            on_agent_response: Callback for agent responses (optional)
+            on_user_transcript: Callback for user transcripts (optional)
+            config: Additional configuration for the conversation (optional)
+            
+        Returns:
+            A conversation object
+        """
+        conversation = ElevenLabsConversation(
+            agent_id=self.agent_id,
+            api_key=self.api_key,
+            audio_interface=audio_interface,
+            config=config,
+            session_url=self.session_url
+        )
+        
+        # Set up callbacks
+        conversation.on_tool_use = on_tool_use
+        conversation.on_agent_response = on_agent_response
+        conversation.on_user_transcript = on_user_transcript
+        
+        return conversation
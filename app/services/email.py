@@ -2,14 +2,65 @@
 Email notification service for Pulsara IVR v2.
 """
 
-from typing import Dict, Any, Optional, List
+import asyncio
+from typing import Dict, Any, Optional, List, Set
+from jinja2 import Environment, BaseLoader
 from app.utils.logging import get_logger
 from app.models.schemas import Call
 from app.core.restaurant import get_restaurant_by_id
 
 logger = get_logger(__name__)
 
-def send_email(to_email: str, subject: str, body: str, attachments: List[Dict[str, Any]] = None) -> bool:
+# Summary emails sent in the background; held here so the tasks are not garbage collected
+_pending_emails: Set[asyncio.Task] = set()
+
+# Email bodies are plain text, so nothing is escaped; templates are compiled once at import
+_template_env = Environment(loader=BaseLoader(), autoescape=False, keep_trailing_newline=True)
+
+_call_summary_template = _template_env.from_string(
+    "\n"
+    "    Call Summary\n"
+    "    ============\n"
+    "    \n"
+    "    Restaurant: {{ restaurant.name }}\n"
+    "    Caller: {{ call.caller_number }}\n"
+    "    Time: {{ call.start_time.strftime('%Y-%m-%d %H:%M:%S') }}\n"
+    "    Duration: {{ duration_str }}\n"
+    "    \n"
+    "    "
+    "{% if call.forwarded %}Forwarded: Yes, to {{ call.forwarded_to }}\n{% else %}Forwarded: No\n{% endif %}"
+    "{% if call.transcript %}\nTranscript:\n{{ call.transcript }}\n{% endif %}"
+    "{% if call.summary %}\nSummary:\n{{ call.summary }}\n{% endif %}"
+    "{% if call.sentiment_label %}\nSentiment: {{ call.sentiment_label.capitalize() }}"
+    "{% if call.sentiment_score is not none %} ({{ call.sentiment_score }}){% endif %}\n{% endif %}"
+    "{% if call.reason %}\nReason for Call: {{ call.reason }}\n{% endif %}"
+    "{% if call.audio_url %}\nAudio Recording: {{ call.audio_url }}\n{% endif %}"
+)
+
+_daily_summary_template = _template_env.from_string(
+    "\n"
+    "    Daily Call Summary for {{ restaurant.name }}\n"
+    "    =====================================\n"
+    "    \n"
+    "    Date: {{ date_str }}\n"
+    "    \n"
+    "    Total Calls: {{ stats['totalCalls'] }}\n"
+    "    AI Handled: {{ stats['aiHandled'] }}\n"
+    "    Forwarded: {{ stats['forwarded'] }}\n"
+    "    Average Duration: {{ (stats['avgDuration'] // 60)|int }}m {{ (stats['avgDuration'] % 60)|int }}s\n"
+    "    \n"
+    "    Sentiment Breakdown:\n"
+    "    - Positive: {{ stats['sentimentBreakdown']['positive'] }}\n"
+    "    - Neutral: {{ stats['sentimentBreakdown']['neutral'] }}\n"
+    "    - Negative: {{ stats['sentimentBreakdown']['negative'] }}\n"
+    "    \n"
+    "    "
+    "{% if stats['callReasons'] %}Call Reasons:\n"
+    "{% for reason, count in stats['callReasons'].items() %}- {{ reason }}: {{ count }}\n{% endfor %}"
+    "{% endif %}"
+)
+
+async def send_email(to_email: str, subject: str, body: str, attachments: List[Dict[str, Any]] = None) -> bool:
     """
     Send an email.
     
@@ -34,7 +85,7 @@ def send_email(to_email: str, subject: str, body: str, attachments: List[Dict[st
     # Mock successful email sending
     return True
 
-def send_call_summary_email(call: Call) -> bool:
+async def send_call_summary_email(call: Call) -> bool:
     """
     Send a call summary email.
     
@@ -44,8 +95,8 @@ def send_call_summary_email(call: Call) -> bool:
     Returns:
         True if the email was sent successfully, False otherwise
     """
-    # Get the restaurant
-    restaurant = get_restaurant_by_id(call.restaurant_id)
+    # Get the restaurant (a blocking database lookup, so it runs in a worker thread)
+    restaurant = await asyncio.to_thread(get_restaurant_by_id, call.restaurant_id)
     if not restaurant:
         logger.warning(f"Restaurant not found for ID: {call.restaurant_id}")
         return False
@@ -63,46 +114,11 @@ def send_call_summary_email(call: Call) -> bool:
     subject = f"Call Summary - {call.caller_number} - {duration_str}"
     
     # Create the email body
-    body = f"""
-    Call Summary
-    ============
-    
-    Restaurant: {restaurant.name}
-    Caller: {call.caller_number}
-    Time: {call.start_time.strftime('%Y-%m-%d %H:%M:%S')}
-    Duration: {duration_str}
-    
-    """
+    body = _call_summary_template.render(restaurant=restaurant, call=call, duration_str=duration_str)
     
-    # Add forwarding information if applicable
-    if call.forwarded:
-        body += f"Forwarded: Yes, to {call.forwarded_to}\n"
-    else:
-        body += "Forwarded: No\n"
-    
-    # Add transcript if available
-    if call.transcript:
-        body += f"\nTranscript:\n{call.transcript}\n"
-    
-    # Add summary if available
-    if call.summary:
-        body += f"\nSummary:\n{call.summary}\n"
-    
-    # Add sentiment if available
-    if call.sentiment_label:
-        body += f"\nSentiment: {call.sentiment_label.capitalize()}"
-        if call.sentiment_score is not None:
-            body += f" ({call.sentiment_score})"
-        body += "\n"
-    
-    # Add reason if available
-    if call.reason:
-        body += f"\nReason for Call: {call.reason}\n"
-    
-    # Add audio link if available
+    # Attach the audio recording if available
     attachments = None
     if call.audio_url:
-        body += f"\nAudio Recording: {call.audio_url}\n"
         attachments = [
             {
                 "filename": f"call_{call.id}.mp3",
@@ -111,9 +127,35 @@ def send_call_summary_email(call: Call) -> bool:
         ]
     
     # Send the email
-    return send_email(to_email, subject, body, attachments)
+    return await send_email(to_email, subject, body, attachments)
+
+def queue_call_summary_email(call: Call) -> None:
+    """
+    Send a call summary email without waiting for it.
+    
+    The email is sent by a background task on the running event loop, so call teardown
+    does not wait on the email service. Without a running loop it is sent inline.
+    
+    Args:
+        call: The call to summarize
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(send_call_summary_email(call))
+        return
+    
+    task = loop.create_task(send_call_summary_email(call))
+    _pending_emails.add(task)
+    task.add_done_callback(_on_summary_email_done)
+
+def _on_summary_email_done(task: asyncio.Task) -> None:
+    """Release a finished background email task and log its failure, if any."""
+    _pending_emails.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Error sending call summary email: {task.exception()}")
 
-def send_daily_summary_email(restaurant_id: str) -> bool:
+async def send_daily_summary_email(restaurant_id: str) -> bool:
     """
     Send a daily summary email.
     
@@ -123,8 +165,8 @@ def send_daily_summary_email(restaurant_id: str) -> bool:
     Returns:
         True if the email was sent successfully, False otherwise
     """
-    # Get the restaurant
-    restaurant = get_restaurant_by_id(restaurant_id)
+    # Get the restaurant (a blocking database lookup, so it runs in a worker thread)
+    restaurant = await asyncio.to_thread(get_restaurant_by_id, restaurant_id)
     if not restaurant:
         logger.warning(f"Restaurant not found for ID: {restaurant_id}")
         return False
@@ -135,7 +177,7 @@ def send_daily_summary_email(restaurant_id: str) -> bool:
     
     # Get call statistics
     from app.core.call import get_call_statistics
-    stats = get_call_statistics(restaurant_id, days=1)
+    stats = await asyncio.to_thread(get_call_statistics, restaurant_id, 1)
     
     # Create the email subject
     from app.utils.helpers import get_current_time
@@ -143,29 +185,7 @@ def send_daily_summary_email(restaurant_id: str) -> bool:
     subject = f"Daily Call Summary - {restaurant.name} - {date_str}"
     
     # Create the email body
-    body = f"""
-    Daily Call Summary for {restaurant.name}
-    =====================================
-    
-    Date: {date_str}
-    
-    Total Calls: {stats['totalCalls']}
-    AI Handled: {stats['aiHandled']}
-    Forwarded: {stats['forwarded']}
-    Average Duration: {int(stats['avgDuration'] // 60)}m {int(stats['avgDuration'] % 60)}s
-    
-    Sentiment Breakdown:
-    - Positive: {stats['sentimentBreakdown']['positive']}
-    - Neutral: {stats['sentimentBreakdown']['neutral']}
-    - Negative: {stats['sentimentBreakdown']['negative']}
-    
-    """
-    
-    # Add call reasons if available
-    if stats['callReasons']:
-        body += "Call Reasons:\n"
-        for reason, count in stats['callReasons'].items():
-            body += f"- {reason}: {count}\n"
+    body = _daily_summary_template.render(restaurant=restaurant, stats=stats, date_str=date_str)
     
     # Send the email
-    return send_email(to_email, subject, body)
+    return await send_email(to_email, subject, body)
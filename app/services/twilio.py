@@ -2,6 +2,9 @@
 Twilio integration service for Pulsara IVR v2.
 """
 
+import asyncio
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from app.utils.logging import get_logger
 from config.environment import TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN
@@ -13,13 +16,18 @@ logger = get_logger(__name__)
 # Initialize Twilio client
 twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
 
-# Call mapping for active calls
-call_mapping = {}
+# Call mapping for active calls (Stream SID -> Call SID), most recent last.
+# Capped so mappings for finished calls cannot accumulate forever.
+MAX_CALL_MAPPINGS = 10000
+call_mapping: "OrderedDict[str, str]" = OrderedDict()
 
+@lru_cache(maxsize=64)
 def generate_twiml_for_incoming_call(host: str) -> str:
     """
     Generate TwiML for an incoming call.
     
+    The TwiML only depends on the host, so it is built once per host and cached.
+    
     Args:
         host: The host name for the WebSocket URL
         
@@ -37,10 +45,13 @@ def generate_twiml_for_incoming_call(host: str) -> str:
     
     return str(response)
 
+@lru_cache(maxsize=64)
 def generate_twiml_for_forwarding(forward_number: str) -> str:
     """
     Generate TwiML for forwarding a call.
     
+    The TwiML only depends on the number, so it is built once per number and cached.
+    
     Args:
         forward_number: The phone number to forward to
         
@@ -119,8 +130,11 @@ def set_call_context(stream_sid: str, call_sid: str, connection_id: str = "unkno
         logger.warning(f"[CONN:{connection_id}] Invalid Call SID provided: {call_sid}")
         return
     
-    # Store the mapping
+    # Store the mapping as the most recent, evicting the oldest beyond the cap
     call_mapping[stream_sid] = call_sid
+    call_mapping.move_to_end(stream_sid)
+    if len(call_mapping) > MAX_CALL_MAPPINGS:
+        call_mapping.popitem(last=False)
     
     logger.info(f"[CONN:{connection_id}] Added mapping: StreamSID={stream_sid} → CallSID={call_sid}")
 
@@ -141,7 +155,7 @@ async def send_hangup_message(stream_sid: str = None, connection_id: str = "unkn
         
         # If no specific Stream SID provided, use the last one (most recent call)
         if stream_sid is None and call_mapping:
-            stream_sid = list(call_mapping.keys())[-1]
+            stream_sid = next(reversed(call_mapping))
             logger.info(f"[CONN:{connection_id}] No StreamSID provided, using most recent: {stream_sid}")
         
         # Look up the Call SID in our mapping
@@ -152,8 +166,8 @@ async def send_hangup_message(stream_sid: str = None, connection_id: str = "unkn
             logger.warning(f"[CONN:{connection_id}] Cannot find any Call SID to terminate")
             return False
         
-        # End the call
-        return end_call(call_sid)
+        # End the call (the Twilio client is blocking, so keep it off the event loop)
+        return await asyncio.to_thread(end_call, call_sid)
         
     except Exception as e:
         logger.error(f"[CONN:{connection_id}] Error ending Twilio call: {str(e)}")
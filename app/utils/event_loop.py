@@ -0,0 +1,24 @@
+"""
+Event loop setup for Pulsara IVR v2.
+"""
+
+import asyncio
+
+def install_uvloop() -> str:
+    """
+    Use uvloop as the asyncio event loop policy when it is available.
+    
+    Must run before any event loop is created so that the ElevenLabs WebSocket
+    conversations, Twilio media streams and HTTP clients all run on libuv.
+    uvloop is not supported on Windows, where the stock asyncio loop is kept.
+    
+    Returns:
+        The loop implementation name to pass to uvicorn ("uvloop" or "asyncio")
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return "asyncio"
+    
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return "uvloop"
@@ -2,12 +2,18 @@
 Helper utilities for Pulsara IVR v2.
 """
 
-import json
+import orjson
+import time
 import uuid
 from datetime import datetime
-import pytz
 from config.settings import TIMEZONE
 
+# Directives that change within a minute; formats without any are cached per minute
+_SUB_MINUTE_DIRECTIVES = ('%S', '%f', '%s', '%c', '%T', '%X', '%r')
+
+# Last formatted time per format string, as (time bucket, formatted string)
+_formatted_time_cache = {}
+
 def generate_connection_id():
     """
     Generate a unique connection ID for tracking calls.
@@ -36,7 +42,20 @@ def get_formatted_time(format_string='%I:%M %p'):
     Returns:
         A formatted time string
     """
-    return get_current_time().strftime(format_string)
+    # Reuse the last result while the time has not moved past the format's resolution
+    now = time.time()
+    now_s = int(now)
+    if not any(directive in format_string for directive in _SUB_MINUTE_DIRECTIVES):
+        now_s //= 60
+    
+    cached = _formatted_time_cache.get(format_string)
+    if cached is not None and cached[0] == now_s:
+        return cached[1]
+    
+    # Format the same instant the bucket was taken from
+    formatted = datetime.fromtimestamp(now, TIMEZONE).strftime(format_string)
+    _formatted_time_cache[format_string] = (now_s, formatted)
+    return formatted
 
 def safe_json_loads(json_string, default=None):
     """
@@ -50,8 +69,8 @@ def safe_json_loads(json_string, default=None):
         The parsed JSON object or the default value
     """
     try:
-        return json.loads(json_string)
-    except (json.JSONDecodeError, TypeError):
+        return orjson.loads(json_string)
+    except (orjson.JSONDecodeError, TypeError):
         return default if default is not None else {}
 
 def safe_json_dumps(obj, default=None):
@@ -66,6 +85,6 @@ def safe_json_dumps(obj, default=None):
         A JSON string or the default value
     """
     try:
-        return json.dumps(obj)
-    except (TypeError, OverflowError):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    except (orjson.JSONEncodeError, TypeError, OverflowError):
         return default if default is not None else "{}"
@@ -15,6 +15,13 @@ def setup_logging():
         format=LOG_FORMAT
     )
     
+    # Skip per-record introspection the log format never uses (thread, process and
+    # caller frame lookups)
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging._srcfile = None
+    
     # Get the root logger
     logger = logging.getLogger()
     
@@ -1,36 +0,0 @@
-"""
-Configuration module for Pulsara IVR v2.
-Centralizes all configuration settings and environment variables.
-"""
-
-import os
-import pytz
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Database Configuration
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-# ElevenLabs Configuration
-ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
-ELEVENLABS_AGENT_ID = os.getenv("ELEVENLABS_AGENT_ID")
-
-# Twilio Configuration
-TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
-TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
-
-# Time Zone Configuration
-DEFAULT_TIMEZONE = pytz.timezone('America/Chicago')  # Default timezone for time formatting
-
-# Server Configuration
-HOST = os.getenv("HOST", "0.0.0.0")
-PORT = int(os.getenv("PORT", "8000"))
-
-# Logging Configuration
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-
-# Menu Database - Will be implemented in v2
-MENU_DB_PATH = os.path.join(os.path.dirname(__file__), "data", "menu.json")
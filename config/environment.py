@@ -4,27 +4,76 @@ Centralizes all environment variables loading.
 """
 
 import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+@dataclass(frozen=True)
+class Environment:
+    """Environment variables, read once at startup."""
+    # ElevenLabs Configuration
+    ELEVENLABS_API_KEY: Optional[str]
+    ELEVENLABS_AGENT_ID: Optional[str]
+    
+    # Twilio Configuration
+    TWILIO_ACCOUNT_SID: Optional[str]
+    TWILIO_AUTH_TOKEN: Optional[str]
+    
+    # Restaurant Information
+    RESTAURANT_OWNER_PHONE: str
+    RESTAURANT_ADDRESS: str
+    RESTAURANT_NAME: str
+    
+    # Server Configuration
+    HOST: str
+    PORT: int
+    
+    # Logging Configuration
+    LOG_LEVEL: str
+
+@lru_cache(maxsize=None)
+def get_environment() -> Environment:
+    """
+    Load the .env file and read the environment variables.
+    Cached so the .env file is only parsed once per process.
+    
+    Returns:
+        The environment configuration
+    """
+    load_dotenv()
+    return Environment(
+        ELEVENLABS_API_KEY=os.getenv("ELEVENLABS_API_KEY"),
+        ELEVENLABS_AGENT_ID=os.getenv("ELEVENLABS_AGENT_ID"),
+        TWILIO_ACCOUNT_SID=os.getenv("TWILIO_ACCOUNT_SID"),
+        TWILIO_AUTH_TOKEN=os.getenv("TWILIO_AUTH_TOKEN"),
+        RESTAURANT_OWNER_PHONE=os.getenv("RESTAURANT_OWNER_PHONE", "224-651-4178"),
+        RESTAURANT_ADDRESS=os.getenv("RESTAURANT_ADDRESS", "1509 W Taylor St, Chicago, IL 60607"),
+        RESTAURANT_NAME=os.getenv("RESTAURANT_NAME", "Pulsara Restaurant"),
+        HOST=os.getenv("HOST", "0.0.0.0"),
+        PORT=int(os.getenv("PORT", "8000")),
+        LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO")
+    )
+
+# Module-level names for existing imports
+_environment = get_environment()
 
 # ElevenLabs Configuration
-ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
-ELEVENLABS_AGENT_ID = os.getenv("ELEVENLABS_AGENT_ID")
+ELEVENLABS_API_KEY = _environment.ELEVENLABS_API_KEY
+ELEVENLABS_AGENT_ID = _environment.ELEVENLABS_AGENT_ID
 
 # Twilio Configuration
-TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
-TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
+TWILIO_ACCOUNT_SID = _environment.TWILIO_ACCOUNT_SID
+TWILIO_AUTH_TOKEN = _environment.TWILIO_AUTH_TOKEN
 
 # Restaurant Information
-RESTAURANT_OWNER_PHONE = os.getenv("RESTAURANT_OWNER_PHONE", "224-651-4178")
-RESTAURANT_ADDRESS = os.getenv("RESTAURANT_ADDRESS", "1509 W Taylor St, Chicago, IL 60607")
-RESTAURANT_NAME = os.getenv("RESTAURANT_NAME", "Pulsara Restaurant")
+RESTAURANT_OWNER_PHONE = _environment.RESTAURANT_OWNER_PHONE
+RESTAURANT_ADDRESS = _environment.RESTAURANT_ADDRESS
+RESTAURANT_NAME = _environment.RESTAURANT_NAME
 
 # Server Configuration
-HOST = os.getenv("HOST", "0.0.0.0")
-PORT = int(os.getenv("PORT", "8000"))
+HOST = _environment.HOST
+PORT = _environment.PORT
 
 # Logging Configuration
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVEL = _environment.LOG_LEVEL
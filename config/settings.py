@@ -4,7 +4,7 @@ Centralizes all configuration settings.
 """
 
 import os
-import pytz
+from zoneinfo import ZoneInfo
 from config.environment import (
     ELEVENLABS_API_KEY,
     ELEVENLABS_AGENT_ID,
@@ -19,7 +19,7 @@ from config.environment import (
 )
 
 # Time Zone Configuration
-TIMEZONE = pytz.timezone('America/Chicago')  # CST
+TIMEZONE = ZoneInfo('America/Chicago')  # CST
 
 # Voice Configuration
 VOICE_ID = "tnSpp4vdxKPjI9w0GnoV"  # Default voice ID
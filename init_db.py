@@ -9,6 +9,7 @@ to resolve SQLAlchemy errors with the current schema.
 import os
 import sys
 from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -22,42 +23,20 @@ if not DATABASE_URL:
 def init_db():
     """Initialize database with required columns."""
     print(f"Connecting to database: {DATABASE_URL}")
-    engine = create_engine(DATABASE_URL)
+    # One-shot script: no point keeping connections pooled
+    engine = create_engine(DATABASE_URL, poolclass=NullPool)
     
-    # First check if the Restaurant table exists
-    with engine.connect() as conn:
-        try:
-            conn.execute(text("SELECT * FROM \"Restaurant\" LIMIT 1"))
-            print("Restaurant table exists")
-        except Exception as e:
-            print(f"Error checking Restaurant table: {e}")
-            print("Make sure the database and basic tables exist first")
-            return
+    # Add the timezone column if it is missing; one idempotent statement, committed on exit
+    try:
+        with engine.begin() as conn:
+            conn.execute(text('ALTER TABLE "Restaurant" ADD COLUMN IF NOT EXISTS timezone VARCHAR DEFAULT \'America/Chicago\''))
+        print("✅ timezone column exists on Restaurant table")
+    except Exception as e:
+        print(f"Error modifying tables: {e}")
+        print("Make sure the database and basic tables exist first")
+        return
     
-    # Now let's try to add the timezone column in a separate connection/transaction
-    with engine.connect() as conn:
-        try:
-            # First check if timezone column exists
-            try:
-                conn.execute(text("SELECT timezone FROM \"Restaurant\" LIMIT 1"))
-                print("✅ timezone column already exists")
-            except Exception:
-                # Commit the transaction before attempting to add the column
-                conn.commit()
-                
-                # Add the missing timezone column in a fresh transaction
-                conn.execute(text('ALTER TABLE "Restaurant" ADD COLUMN timezone VARCHAR DEFAULT \'America/Chicago\''))
-                print("✅ Added timezone column to Restaurant table")
-                
-                # Commit the changes
-                conn.commit()
-                
-            print("Database initialization complete!")
-            
-        except Exception as e:
-            print(f"Error modifying tables: {e}")
-            conn.rollback()
-            return
+    print("Database initialization complete!")
 
 if __name__ == "__main__":
     init_db() 
\ No newline at end of file
@@ -2,18 +2,25 @@
 Main entry point for Pulsara IVR v2.
 """
 
-import uvicorn
 from app import create_app
+from app.utils.event_loop import install_uvloop
 from config.settings import SERVER
 
+# Use uvloop for all asyncio I/O before any event loop exists
+EVENT_LOOP = install_uvloop()
+
 # Create the FastAPI application
 app = create_app()
 
 if __name__ == "__main__":
+    # Only needed when run directly; ASGI servers import main:app themselves
+    import uvicorn
+    
     # Run the application using uvicorn
     uvicorn.run(
         "main:app",
         host=SERVER["host"],
         port=SERVER["port"],
+        loop=EVENT_LOOP,
         reload=True
     )
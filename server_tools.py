@@ -9,9 +9,13 @@ during a conversation when appropriate.
 """
 
 import logging
-import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, Any
-from dotenv import load_dotenv
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from twilio.http.http_client import TwilioHttpClient
 from twilio.rest import Client
 from sqlalchemy.orm import Session
 
@@ -19,23 +23,43 @@ from sqlalchemy.orm import Session
 from app.db import SessionLocal
 from app.models.database_models import Restaurant as RestaurantModel
 from app.core.restaurant import get_restaurant_by_id
+from config.environment import TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, 
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-
-# Initialize Twilio client
-TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
-TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
-twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+@lru_cache(maxsize=1)
+def _twilio() -> Client:
+    """
+    Get the Twilio client, creating it on first use.
+    
+    The client keeps one pooled keep-alive session, so hangups after the first
+    reuse the connection to the Twilio API instead of opening a new one.
+    
+    Returns:
+        The shared Twilio client
+    """
+    http_client = TwilioHttpClient(pool_connections=True)
+    http_client.session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+    return Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, http_client=http_client)
 
 # Track active connections and call details
-# This works with concurrent calls because each has a unique Stream SID
-call_mapping = {}
+# This works with concurrent calls because each has a unique Stream SID.
+# Most recent last, and capped so mappings for failed hangups cannot accumulate forever.
+MAX_CALL_MAPPINGS = 1024
+call_mapping: "OrderedDict[str, str]" = OrderedDict()
+
+# Restaurant addresses by restaurant ID; they rarely change, so a lookup is reused for 5 minutes
+ADDRESS_CACHE_TTL = 300
+_address_cache: TTLCache = TTLCache(maxsize=1024, ttl=ADDRESS_CACHE_TTL)
+
+# Fixed tool responses, built once and shared (callers must not modify them)
+_OK_END_CALL = {"status": "success", "message": "Call ended successfully by agent"}
+_ERR_END_CALL = {"status": "error", "message": "Failed to end call"}
+_ERR_NO_RESTAURANT = {"status": "error", "message": "Restaurant information not available"}
+_ERR_NO_ADDRESS = {"status": "error", "message": "This restaurant has not set up their address information"}
 
 # Counter for call statistics
 call_stats = {
@@ -43,6 +67,20 @@ call_stats = {
     "successful_terminations": 0,
     "failed_terminations": 0
 }
+_stats_lock = threading.Lock()
+
+def _count_call_stat(field):
+    """
+    Increment one call_stats counter.
+    
+    Tool handlers and the audio interface can run on different threads, so the
+    read-modify-write is done under a lock.
+    
+    Args:
+        field: The call_stats key to increment
+    """
+    with _stats_lock:
+        call_stats[field] += 1
 
 # Backup storage for latest Call SID (used when Stream SID mapping fails)
 latest_call_sid = None
@@ -81,9 +119,12 @@ def set_call_context(stream_sid, call_sid, connection_id="unknown"):
             logger.warning(f"[CONN:{connection_id}] Invalid Call SID provided: {call_sid}")
             return
     
-    # Store the mapping
+    # Store the mapping as the most recent, evicting the oldest beyond the cap
     call_mapping[stream_sid] = call_sid
-    call_stats["total_calls"] += 1
+    call_mapping.move_to_end(stream_sid)
+    if len(call_mapping) > MAX_CALL_MAPPINGS:
+        call_mapping.popitem(last=False)
+    _count_call_stat("total_calls")
     
     # Log the mapping creation but not the full state (reduces noise)
     logger.info(f"[CONN:{connection_id}] Added mapping: StreamSID={stream_sid} → CallSID={call_sid}")
@@ -101,50 +142,53 @@ async def send_hangup_message(stream_sid=None, connection_id="unknown"):
     """
     global latest_call_sid, call_stats
     
+    call_sid = None
     try:
-        call_sid = None
-        logger.info(f"[CONN:{connection_id}] Hangup request received for StreamSID={stream_sid}")
-        
         # If no specific Stream SID provided, use the last one (most recent call)
+        source = "mapping"
         if stream_sid is None and call_mapping:
-            stream_sid = list(call_mapping.keys())[-1]
-            logger.info(f"[CONN:{connection_id}] No StreamSID provided, using most recent: {stream_sid}")
+            stream_sid = next(reversed(call_mapping))
+            source = "most_recent"
         
         # Look up the Call SID in our mapping
         if stream_sid and stream_sid in call_mapping:
             call_sid = call_mapping[stream_sid]
-            logger.info(f"[CONN:{connection_id}] Found matching CallSID: {call_sid}")
         # Try using the backup Call SID if we couldn't find one in the mapping
         elif latest_call_sid:
             call_sid = latest_call_sid
-            logger.info(f"[CONN:{connection_id}] Using backup CallSID: {call_sid}")
+            source = "backup"
         else:
-            logger.warning(f"[CONN:{connection_id}] Cannot find any Call SID to terminate")
-            call_stats["failed_terminations"] += 1
+            logger.warning(f"[CONN:{connection_id}] Cannot find any Call SID to terminate (StreamSID={stream_sid})")
+            _count_call_stat("failed_terminations")
             return False
         
         # Use Twilio REST API to end the call
-        logger.info(f"[CONN:{connection_id}] Ending call with CallSID={call_sid}")
-        call = twilio_client.calls(call_sid).update(status="completed")
-        logger.info(f"[CONN:{connection_id}] Twilio API response status: {call.status}")
+        call = _twilio().calls(call_sid).update(status="completed")
         
         # Remove from active calls if we have a valid stream_sid
-        if stream_sid and stream_sid in call_mapping:
-            del call_mapping[stream_sid]
-            logger.info(f"[CONN:{connection_id}] Removed mapping for StreamSID={stream_sid}")
+        mapping_removed = call_mapping.pop(stream_sid, None) is not None if stream_sid else False
         
         # Clear the backup call SID since we've used it
         latest_call_sid = None
         
         # Update stats
-        call_stats["successful_terminations"] += 1
-        logger.info(f"[CONN:{connection_id}] Call stats: {call_stats}")
+        _count_call_stat("successful_terminations")
+        
+        # One line per hangup with everything that was resolved along the way
+        logger.info(
+            "[CONN:%s] Hangup: StreamSID=%s CallSID=%s source=%s twilio_status=%s mapping_removed=%s",
+            connection_id, stream_sid, call_sid, source, call.status, mapping_removed
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            with _stats_lock:
+                stats_snapshot = dict(call_stats)
+            logger.debug("[CONN:%s] Call stats: %s", connection_id, stats_snapshot)
         
         return True
         
     except Exception as e:
-        logger.error(f"[CONN:{connection_id}] Error ending Twilio call: {str(e)}")
-        call_stats["failed_terminations"] += 1
+        logger.error(f"[CONN:{connection_id}] Error ending Twilio call (StreamSID={stream_sid}, CallSID={call_sid}): {str(e)}")
+        _count_call_stat("failed_terminations")
         return False
 
 # Server-side tool implementations
@@ -177,10 +221,10 @@ async def end_call(custom_state: Dict[str, Any] = None, params: Dict[str, Any] =
         
         if success:
             logger.info(f"[CONN:{connection_id}] Agent-initiated call termination successful")
-            return {"status": "success", "message": "Call ended successfully by agent"}
+            return _OK_END_CALL
         else:
             logger.warning(f"[CONN:{connection_id}] Agent-initiated call termination FAILED")
-            return {"status": "error", "message": "Failed to end call"}
+            return _ERR_END_CALL
             
     except Exception as e:
         logger.error(f"Error ending call: {str(e)}")
@@ -216,26 +260,26 @@ async def get_address(custom_state: Dict[str, Any] = None, params: Dict[str, Any
         # Validate restaurant_id
         if not restaurant_id:
             logger.warning(f"[CONN:{connection_id}] No restaurant_id in connection_info")
-            return {
-                "status": "error",
-                "message": "Restaurant information not available"
-            }
+            return _ERR_NO_RESTAURANT
         
-        # Fetch restaurant address from database
-        db = SessionLocal()
-        try:
-            restaurant = db.query(RestaurantModel).filter(RestaurantModel.id == restaurant_id).first()
-            if restaurant and restaurant.address:
-                address = restaurant.address
-                logger.info(f"[CONN:{connection_id}] Found address in database: {address}")
-            else:
-                logger.warning(f"[CONN:{connection_id}] Restaurant or address not found in database for ID: {restaurant_id}")
-                return {
-                    "status": "error",
-                    "message": "This restaurant has not set up their address information"
-                }
-        finally:
-            db.close()
+        # Use the cached address if it was looked up recently
+        address = _address_cache.get(restaurant_id)
+        if address:
+            logger.info(f"[CONN:{connection_id}] Found address in cache: {address}")
+        else:
+            # Fetch restaurant address from database
+            db = SessionLocal()
+            try:
+                restaurant = db.get(RestaurantModel, restaurant_id)
+                if restaurant and restaurant.address:
+                    address = restaurant.address
+                    _address_cache[restaurant_id] = address
+                    logger.info(f"[CONN:{connection_id}] Found address in database: {address}")
+                else:
+                    logger.warning(f"[CONN:{connection_id}] Restaurant or address not found in database for ID: {restaurant_id}")
+                    return _ERR_NO_ADDRESS
+            finally:
+                db.close()
         
         logger.info(f"[CONN:{connection_id}] Returning address: {address}")
         
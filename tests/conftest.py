@@ -0,0 +1,14 @@
+"""
+Shared pytest fixtures.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    A TestClient for one app instance shared by the whole test session.
+    """
+    from app import create_app
+    return TestClient(create_app())
@@ -3,14 +3,8 @@ Tests for health routes.
 """
 
 import pytest
-from fastapi.testclient import TestClient
-from app import create_app
 
-# Create a test client
-app = create_app()
-client = TestClient(app)
-
-def test_health_check():
+def test_health_check(client):
     """
     Test the health check endpoint.
     """
@@ -21,7 +15,7 @@ def test_health_check():
     assert "elevenlabs_api_key_set" in response.json()
     assert "twilio_account_sid_set" in response.json()
 
-def test_service_status():
+def test_service_status(client):
     """
     Test the service status endpoint.
     """
@@ -31,7 +25,7 @@ def test_service_status():
     assert "active_calls" in response.json()
     assert "restaurants" in response.json()
 
-def test_metrics():
+def test_metrics(client):
     """
     Test the metrics endpoint.
     """
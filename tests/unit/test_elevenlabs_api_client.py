@@ -3,217 +3,261 @@ Unit tests for the ElevenLabs API client.
 """
 
 import pytest
+import pytest_asyncio
 import json
 import asyncio
-from unittest.mock import patch, MagicMock
-from app.services.elevenlabs_api_client import ElevenLabsAPIClient
+import httpx
+import orjson
+from app.services.elevenlabs_api_client import ElevenLabsAPIClient, CircuitOpenError
 from app.models.schemas import Agent, KnowledgeBase
 
-@pytest.fixture
-def api_client():
-    """Create an ElevenLabs API client for testing."""
-    with patch('app.services.elevenlabs_api_client.ELEVENLABS_API_KEY', 'test_api_key'):
-        client = ElevenLabsAPIClient()
-        yield client
+# HTTPX is mocked at the transport layer by respx, so every test goes through the
+# client's real request building; routes below are relative to this base URL.
+# Tests share the session event loop, like the session-scoped client below.
+pytestmark = [
+    pytest.mark.respx(base_url="https://api.elevenlabs.io/v1"),
+    pytest.mark.asyncio(loop_scope="session")
+]
 
-@pytest.fixture
-def mock_response():
-    """Create a mock HTTP response."""
-    mock = MagicMock()
-    mock.status_code = 200
-    mock.headers = {'content-type': 'application/json'}
-    mock.json.return_value = {'success': True}
-    mock.raise_for_status = MagicMock()
-    return mock
+@pytest.fixture(scope="session", autouse=True)
+def _set_api_key():
+    """Use a fake ElevenLabs API key for the whole session."""
+    mp = pytest.MonkeyPatch()
+    mp.setattr('app.services.elevenlabs_api_client.ELEVENLABS_API_KEY', 'test_api_key')
+    yield
+    mp.undo()
 
-@pytest.fixture
-def mock_httpx_client():
-    """Create a mock HTTPX client."""
-    with patch('app.services.elevenlabs_api_client.httpx.AsyncClient') as mock:
-        client_instance = MagicMock()
-        mock.return_value = client_instance
-        
-        # Mock HTTP methods
-        client_instance.get = MagicMock()
-        client_instance.post = MagicMock()
-        client_instance.patch = MagicMock()
-        client_instance.delete = MagicMock()
-        
-        yield client_instance
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def api_client():
+    """Create one ElevenLabs API client shared by every test in the session."""
+    client = ElevenLabsAPIClient()
+    yield client
+    await client.close()
 
-@pytest.mark.asyncio
-async def test_create_agent(api_client, mock_httpx_client, mock_response):
-    """Test creating an agent."""
-    # Setup
-    mock_httpx_client.post.return_value = mock_response
-    mock_response.json.return_value = {'agent_id': 'test_agent_id'}
-    
-    # Create a test agent
-    agent_config = {
-        'conversation_config': {
-            'agent': {
-                'prompt': {
-                    'prompt': json.dumps({}),
-                    'tools': []
-                },
-                'first_message': 'Hello',
-                'language': 'en'
+@pytest.fixture(autouse=True)
+def reset_api_client(api_client):
+    """Clear the shared client's cached responses and circuit state before each test."""
+    api_client._cache.clear()
+    api_client._inflight.clear()
+    api_client.circuit_breaker.record_success()
+
+AGENT_CONFIG = {
+    'conversation_config': {
+        'agent': {
+            'prompt': {
+                'prompt': json.dumps({}),
+                'tools': []
             },
-            'tts': {
-                'voice_id': 'test_voice_id'
+            'first_message': 'Hello',
+            'language': 'en'
+        },
+        'tts': {
+            'voice_id': 'test_voice_id'
+        }
+    },
+    'name': 'Test Agent'
+}
+
+@pytest.mark.parametrize("method,path,data,expected", [
+    pytest.param(
+        'POST', 'convai/agents/create', AGENT_CONFIG,
+        {'agent_id': 'test_agent_id'},
+        id='create_agent'
+    ),
+    pytest.param(
+        'GET', 'convai/agents/test_agent_id', None,
+        {'agent_id': 'test_agent_id', 'name': 'Test Agent', 'conversation_config': {}},
+        id='get_agent'
+    ),
+    pytest.param(
+        'PATCH', 'convai/agents/test_agent_id', {'name': 'Updated Agent'},
+        {'agent_id': 'test_agent_id', 'name': 'Updated Agent'},
+        id='update_agent'
+    ),
+    pytest.param(
+        'GET', 'convai/knowledge-base', None,
+        {
+            'documents': [
+                {'id': 'doc1', 'name': 'Document 1'},
+                {'id': 'doc2', 'name': 'Document 2'}
+            ],
+            'has_more': False
+        },
+        id='list_knowledge_base'
+    ),
+    pytest.param(
+        'GET', 'convai/knowledge-base/doc1', None,
+        {
+            'id': 'doc1',
+            'name': 'Document 1',
+            'type': 'file',
+            'metadata': {
+                'created_at_unix_secs': 1234567890,
+                'last_updated_at_unix_secs': 1234567890,
+                'size_bytes': 1024
             }
         },
-        'name': 'Test Agent'
-    }
+        id='get_knowledge_base_document'
+    ),
+    pytest.param(
+        'POST', 'convai/knowledge-base', {'name': 'New Document'},
+        {'id': 'new_doc', 'prompt_injectable': True},
+        id='create_knowledge_base_document'
+    ),
+    pytest.param(
+        'DELETE', 'convai/knowledge-base/doc1', None,
+        {'key': 'value'},
+        id='delete_knowledge_base_document'
+    ),
+])
+async def test_make_request(api_client, respx_mock, method, path, data, expected):
+    """Test that each endpoint call sends the expected request and returns the parsed JSON."""
+    # Setup
+    route = respx_mock.request(method, f"/{path}").mock(
+        return_value=httpx.Response(200, json=expected)
+    )
     
     # Call the method
-    result = await api_client._make_request('POST', 'convai/agents/create', data=agent_config)
+    result = await api_client._make_request(method, path, data=data)
     
     # Assertions
-    mock_httpx_client.post.assert_called_once()
-    assert result == {'agent_id': 'test_agent_id'}
+    assert route.call_count == 1
+    request = route.calls.last.request
+    assert request.headers['xi-api-key'] == 'test_api_key'
+    if data is not None:
+        assert request.headers['content-type'] == 'application/json'
+        assert orjson.loads(request.content) == data
+    assert result == expected
 
-@pytest.mark.asyncio
-async def test_get_agent(api_client, mock_httpx_client, mock_response):
-    """Test getting an agent."""
+async def test_concurrent_gets_are_coalesced(api_client, respx_mock):
+    """Test that concurrent identical GETs share a single HTTP request."""
     # Setup
-    mock_httpx_client.get.return_value = mock_response
-    mock_response.json.return_value = {
-        'agent_id': 'test_agent_id',
-        'name': 'Test Agent',
-        'conversation_config': {}
-    }
+    async def slow_get(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={'agent_id': 'test_agent_id'})
     
-    # Call the method
-    result = await api_client._make_request('GET', 'convai/agents/test_agent_id')
+    route = respx_mock.get("/convai/agents/test_agent_id").mock(side_effect=slow_get)
+    
+    # Call the method concurrently
+    results = await asyncio.gather(
+        *(api_client._make_request('GET', 'convai/agents/test_agent_id') for _ in range(5))
+    )
     
     # Assertions
-    mock_httpx_client.get.assert_called_once()
-    assert result['agent_id'] == 'test_agent_id'
-    assert result['name'] == 'Test Agent'
+    assert route.call_count == 1
+    assert all(result == {'agent_id': 'test_agent_id'} for result in results)
+    assert api_client._inflight == {}
+    
+    # A later GET goes back to the network
+    await api_client._make_request('GET', 'convai/agents/test_agent_id')
+    assert route.call_count == 2
 
-@pytest.mark.asyncio
-async def test_update_agent(api_client, mock_httpx_client, mock_response):
-    """Test updating an agent."""
+async def test_get_agent_is_cached_until_update(api_client, respx_mock):
+    """Test that agent reads are served from cache and invalidated by an update."""
     # Setup
-    mock_httpx_client.patch.return_value = mock_response
-    mock_response.json.return_value = {
-        'agent_id': 'test_agent_id',
-        'name': 'Updated Agent'
-    }
+    response = httpx.Response(200, json={'agent_id': 'test_agent_id'})
+    get_route = respx_mock.get("/convai/agents/test_agent_id").mock(return_value=response)
+    respx_mock.patch("/convai/agents/test_agent_id").mock(return_value=response)
     
-    # Create update data
-    update_data = {
-        'name': 'Updated Agent'
-    }
+    # Repeat reads hit the cache
+    await api_client.get_agent('test_agent_id')
+    await api_client.get_agent('test_agent_id')
+    assert get_route.call_count == 1
     
-    # Call the method
-    result = await api_client._make_request('PATCH', 'convai/agents/test_agent_id', data=update_data)
-    
-    # Assertions
-    mock_httpx_client.patch.assert_called_once()
-    assert result['name'] == 'Updated Agent'
+    # An update drops the cached entry
+    await api_client.update_agent('test_agent_id', {'name': 'Updated Agent'})
+    await api_client.get_agent('test_agent_id')
+    assert get_route.call_count == 2
 
-@pytest.mark.asyncio
-async def test_list_knowledge_base(api_client, mock_httpx_client, mock_response):
-    """Test listing knowledge base documents."""
+async def test_json_response_with_charset_is_parsed(api_client, respx_mock):
+    """Test that a JSON content type with parameters is still parsed."""
     # Setup
-    mock_httpx_client.get.return_value = mock_response
-    mock_response.json.return_value = {
-        'documents': [
-            {
-                'id': 'doc1',
-                'name': 'Document 1'
-            },
-            {
-                'id': 'doc2',
-                'name': 'Document 2'
-            }
-        ],
-        'has_more': False
-    }
+    respx_mock.get("/convai/agents/test_agent_id").mock(
+        return_value=httpx.Response(
+            200,
+            headers={'content-type': 'application/json; charset=utf-8'},
+            content=orjson.dumps({'agent_id': 'test_agent_id'})
+        )
+    )
     
     # Call the method
-    result = await api_client._make_request('GET', 'convai/knowledge-base')
+    result = await api_client._make_request('GET', 'convai/agents/test_agent_id')
     
     # Assertions
-    mock_httpx_client.get.assert_called_once()
-    assert len(result['documents']) == 2
-    assert result['documents'][0]['name'] == 'Document 1'
-    assert result['documents'][1]['name'] == 'Document 2'
+    assert result == {'agent_id': 'test_agent_id'}
 
-@pytest.mark.asyncio
-async def test_get_knowledge_base_document(api_client, mock_httpx_client, mock_response):
-    """Test getting a knowledge base document."""
+async def test_transient_errors_are_retried(api_client, respx_mock, monkeypatch):
+    """Test that a 503 is retried and the next successful response is returned."""
     # Setup
-    mock_httpx_client.get.return_value = mock_response
-    mock_response.json.return_value = {
-        'id': 'doc1',
-        'name': 'Document 1',
-        'type': 'file',
-        'metadata': {
-            'created_at_unix_secs': 1234567890,
-            'last_updated_at_unix_secs': 1234567890,
-            'size_bytes': 1024
-        }
-    }
+    monkeypatch.setattr(api_client, 'RETRY_WAIT_MAX', 0)
+    route = respx_mock.get("/convai/agents/test_agent_id").mock(
+        side_effect=[httpx.Response(503), httpx.Response(200, json={'agent_id': 'test_agent_id'})]
+    )
     
     # Call the method
-    result = await api_client._make_request('GET', 'convai/knowledge-base/doc1')
+    result = await api_client._make_request('GET', 'convai/agents/test_agent_id')
     
     # Assertions
-    mock_httpx_client.get.assert_called_once()
-    assert result['id'] == 'doc1'
-    assert result['name'] == 'Document 1'
-    assert result['type'] == 'file'
+    assert route.call_count == 2
+    assert result == {'agent_id': 'test_agent_id'}
 
-@pytest.mark.asyncio
-async def test_create_knowledge_base_document(api_client, mock_httpx_client, mock_response):
-    """Test creating a knowledge base document."""
+async def test_circuit_opens_after_repeated_failures(api_client, respx_mock, monkeypatch):
+    """Test that the client fails fast once ElevenLabs keeps failing."""
     # Setup
-    mock_httpx_client.post.return_value = mock_response
-    mock_response.json.return_value = {
-        'id': 'new_doc',
-        'prompt_injectable': True
-    }
+    monkeypatch.setattr(api_client, 'RETRY_WAIT_MAX', 0)
+    route = respx_mock.get("/convai/agents/test_agent_id").mock(
+        side_effect=httpx.ConnectError('connection refused')
+    )
     
-    # Call the method
-    result = await api_client._make_request('POST', 'convai/knowledge-base', data={'name': 'New Document'})
+    # Exhaust the breaker
+    for _ in range(api_client.circuit_breaker.fail_max):
+        with pytest.raises(httpx.ConnectError):
+            await api_client._make_request('GET', 'convai/agents/test_agent_id')
+    calls = route.call_count
     
     # Assertions
-    mock_httpx_client.post.assert_called_once()
-    assert result['id'] == 'new_doc'
-    assert result['prompt_injectable'] is True
+    with pytest.raises(CircuitOpenError):
+        await api_client._make_request('GET', 'convai/agents/test_agent_id')
+    assert route.call_count == calls
 
-@pytest.mark.asyncio
-async def test_delete_knowledge_base_document(api_client, mock_httpx_client, mock_response):
-    """Test deleting a knowledge base document."""
+async def test_circuit_lets_one_trial_through_after_timeout(api_client, respx_mock, monkeypatch):
+    """Test that only one request probes ElevenLabs once the reset timeout has passed."""
     # Setup
-    mock_httpx_client.delete.return_value = mock_response
-    mock_response.json.return_value = {'key': 'value'}
+    monkeypatch.setattr(api_client, 'RETRY_WAIT_MAX', 0)
+    breaker = api_client.circuit_breaker
+    for _ in range(breaker.fail_max):
+        breaker.record_failure()
+    breaker.opened_at -= breaker.reset_timeout
     
-    # Call the method
-    result = await api_client._make_request('DELETE', 'convai/knowledge-base/doc1')
+    async def slow_patch(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={'agent_id': 'test_agent_id'})
     
-    # Assertions
-    mock_httpx_client.delete.assert_called_once()
-    assert result == {'key': 'value'}
-
-@pytest.mark.asyncio
-async def test_error_handling(api_client, mock_httpx_client):
+    route = respx_mock.patch("/convai/agents/test_agent_id").mock(side_effect=slow_patch)
+    
+    # Call the method concurrently
+    results = await asyncio.gather(
+        *(api_client._make_request('PATCH', 'convai/agents/test_agent_id', data={'name': 'Agent'}) for _ in range(5)),
+        return_exceptions=True
+    )
+    
+    # Assertions: one trial went out, the rest failed fast, and its success closed the circuit
+    assert route.call_count == 1
+    assert results.count({'agent_id': 'test_agent_id'}) == 1
+    assert sum(isinstance(result, CircuitOpenError) for result in results) == 4
+    assert breaker.opened_at is None
+    
+async def test_error_handling(api_client, respx_mock):
     """Test error handling."""
     # Setup
-    error_response = MagicMock()
-    error_response.status_code = 422
-    error_response.text = '{"error": "Unprocessable Entity"}'
-    error_response.json.return_value = {'error': 'Unprocessable Entity'}
-    error_response.raise_for_status.side_effect = Exception('HTTP Error')
-    
-    mock_httpx_client.get.return_value = error_response
+    route = respx_mock.get("/convai/agents/invalid_id").mock(
+        return_value=httpx.Response(422, json={'error': 'Unprocessable Entity'})
+    )
     
     # Call the method and expect an exception
-    with pytest.raises(Exception):
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
         await api_client._make_request('GET', 'convai/agents/invalid_id')
     
-    # Assertions
-    mock_httpx_client.get.assert_called_once()
+    # Assertions: client errors are not retried
+    assert exc_info.value.response.status_code == 422
+    assert route.call_count == 1